@@ -0,0 +1,171 @@
+"""A tippeket ábrázoló Balaton térkép gyorsítótárazott kirajzolása.
+
+A statikus háttér (kiterjedés + határok, partvonal, szárazföld, tavak) kirajzolása a drága rész.
+Ezt folyamatonként egyszer rajzoljuk meg, és raszterként (RGBA tömbként) eltároljuk.
+A geometria a csomaggal szállított, a Balaton környékére előre kivágott balaton_geometria.npz-ből
+jön (lásd geometria_kivagas.py; GSHHG adat, LGPL-3.0-or-later, a forrásmegjelölés a
+balaton_geometria.NOTICE.txt-ben), amit sima matplotlibbel rajzolunk ki: nincs cartopy import és
+nincs Natural Earth letöltés, így a térkép hálózat nélkül is azonnal elkészül. Ha a fájl hiányzik,
+a korábbi cartopy-s rajzolás fut (az első alkalommal letölti a Natural Earth rétegeket).
+Egy térképnél már csak a tippelt városok pontjait és neveit rajzoljuk rá erre a képre,
+a kész PNG-ket pedig a tippelt városok halmaza szerint gyorsítótárazzuk.
+
+A pyplot helyett közvetlenül matplotlib.figure.Figure objektumokat használunk, így a figurák
+nem kerülnek be a pyplot globális nyilvántartásába, és a függvény végén felszabadulnak
+(hosszan futó szerveren sem nő a memória).
+"""
+
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from io import BytesIO
+
+GEOMETRIA_FAJL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "balaton_geometria.npz")
+
+# (min_lon, max_lon, min_lat, max_lat); a játék a helységnévtárhoz igazítja (terbeli_index.kiterjedes)
+KITERJEDES = (17.18, 18.4, 46.66, 47.1)
+MERET = (8, 8)  # hüvelykben, mint korábban a plt.subplots(figsize=(8, 8))
+DPI = 100
+CIM = "Így jutottál el a célig :))"
+
+# a cartopy cfeature.LAND színe, hogy a két rajzolás egyforma legyen
+SZARAZFOLD_SZIN = (240 / 256, 240 / 256, 220 / 256)
+
+# a matplotlib (és a cartopy geometria betöltés) nem szálbiztos, a streamlit viszont több szálon futtat
+_rajzolo_zar = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def geometria(utvonal=GEOMETRIA_FAJL):
+    """A csomagolt geometria rétegei: név --> (n, 2) lon/lat tömbök listája,
+    vagy None, ha a fájl nincs meg (ilyenkor a cartopy rajzol)."""
+
+    import numpy as np
+
+    if not os.path.isfile(utvonal):
+        return None
+    with np.load(utvonal, allow_pickle=False) as npz:
+        return {
+            nev: np.split(npz[nev].astype(np.float64), npz[f"{nev}_hatarok"][1:-1])
+            if len(npz[nev])
+            else []
+            for nev in ("szarazfold", "to", "partvonal", "hatar")
+        }
+
+
+@lru_cache(maxsize=1)
+def rajzolo_azonosito(utvonal=GEOMETRIA_FAJL):
+    """Mivel rajzoljuk a háttértérképet: "geometria:<a fájl tartalmának hash-e>" vagy "cartopy".
+    Az elo_terkep.py a statikus PNG nevébe teszi, hogy a geometria cseréje új képet adjon."""
+
+    try:
+        with open(utvonal, "rb") as f:
+            return f"geometria:{hashlib.sha256(f.read()).hexdigest()[:16]}"
+    except OSError:
+        return "cartopy"
+
+
+def _rajzolas_geometriabol(fig, kiterjedes, retegek):
+    from matplotlib.collections import LineCollection, PolyCollection
+
+    # PlateCarree: a hosszúság és a szélesség fokban, egyenlő léptékkel (mint a cartopy GeoAxes-e)
+    ax = fig.add_subplot()
+    min_lon, max_lon, min_lat, max_lat = kiterjedes
+    ax.set_xlim(min_lon, max_lon)
+    ax.set_ylim(min_lat, max_lat)
+    ax.set_aspect("equal", adjustable="box")
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.add_collection(
+        PolyCollection(retegek["szarazfold"], facecolor=SZARAZFOLD_SZIN, edgecolor="black")
+    )
+    ax.add_collection(PolyCollection(retegek["to"], color="blue"))
+    ax.add_collection(LineCollection(retegek["partvonal"], color="black"))
+    ax.add_collection(LineCollection(retegek["hatar"], color="black", linestyle=":"))
+    return ax
+
+
+def _rajzolas_cartopyval(fig, kiterjedes):
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
+    ax = fig.add_subplot(projection=ccrs.PlateCarree())
+    # a háttér sablonja chat gpt-nek köszönhető (korábban közvetlenül a terkep()-ben volt)
+    ax.set_extent(list(kiterjedes))
+    ax.add_feature(cfeature.BORDERS, linestyle=":")
+    ax.add_feature(cfeature.COASTLINE)
+    ax.add_feature(cfeature.LAND, edgecolor="black")
+    ax.add_feature(cfeature.LAKES, color="blue")
+    return ax
+
+
+@lru_cache(maxsize=4)
+def alapterkep(kiterjedes=KITERJEDES):
+    """A háttértérkép kirajzolása egyszer, visszatérési érték: a térkép területének
+    RGBA pixeltömbje (csak olvasható numpy tömb)."""
+
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    retegek = geometria()
+    with _rajzolo_zar:
+        fig = Figure(figsize=MERET, dpi=DPI)
+        FigureCanvasAgg(fig)
+        if retegek is not None:
+            ax = _rajzolas_geometriabol(fig, kiterjedes, retegek)
+        else:
+            ax = _rajzolas_cartopyval(fig, kiterjedes)
+        fig.canvas.draw()
+
+        # csak a térkép tengelyének területét vágjuk ki (a pixeltömb sorai felülről indulnak)
+        kepkocka = ax.get_window_extent()
+        rgba = np.asarray(fig.canvas.buffer_rgba())
+        magassag = rgba.shape[0]
+        x0, x1 = int(round(kepkocka.x0)), int(round(kepkocka.x1))
+        y0, y1 = magassag - int(round(kepkocka.y1)), magassag - int(round(kepkocka.y0))
+        raszter = rgba[y0:y1, x0:x1].copy()
+
+    raszter.setflags(write=False)
+    return raszter
+
+
+@lru_cache(maxsize=256)
+def terkep_png(tippek, kiterjedes=KITERJEDES):
+    """A tippelt városokat (név, latitude, longitude) hármasok rendezett tuple-jeként kapja meg,
+    és a háttértérképre rajzolva PNG bájtokként adja vissza."""
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    raszter = alapterkep(kiterjedes)
+    min_lon, max_lon, min_lat, max_lat = kiterjedes
+
+    with _rajzolo_zar:
+        fig = Figure(figsize=(raszter.shape[1] / DPI, raszter.shape[0] / DPI), dpi=DPI)
+        FigureCanvasAgg(fig)
+        ax = fig.add_axes([0, 0, 1, 1])
+        # a PlateCarree vetületben a hosszúság/szélesség lineárisan képződik le, így a
+        # raszter fölé egyszerű tengelyt tehetünk ugyanazzal a kiterjedéssel
+        ax.imshow(
+            raszter,
+            extent=(min_lon, max_lon, min_lat, max_lat),
+            aspect="auto",
+            interpolation="none",
+        )
+        ax.set_xlim(min_lon, max_lon)
+        ax.set_ylim(min_lat, max_lat)
+        ax.set_axis_off()
+
+        for város, latitude, longitude in tippek:
+            ax.scatter(longitude, latitude, color="red", s=50, zorder=10)
+            ax.text(longitude + 0.015, latitude - 0.02, város, fontsize=8)
+
+        ax.set_title(CIM, fontsize=10)
+
+        kimenet = BytesIO()
+        fig.savefig(kimenet, format="png", dpi=DPI, bbox_inches="tight")
+
+    return kimenet.getvalue()
+
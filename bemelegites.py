@@ -0,0 +1,119 @@
+"""Bemelegítés: a játék közös, folyamatonkénti gyorsítótárainak feltöltése még azelőtt, hogy az
+első játékos csatlakozna.
+
+Alapból minden nehéz lépés lusta (a pandas csak az xlsx értelmezéséhez, a matplotlib csak a
+háttértérkép rajzolásához töltődik be), így a szerver gyorsan elindul, de az első játékos
+várja ki a helységnévtár felépítését, a legördülő lista rendezését és a háttértérkép
+kirajzolását. Ha ezt el akarjuk kerülni, a szervert így indítsuk:
+
+    python bemelegites.py [további streamlit run kapcsolók]
+
+Ez ugyanabban a folyamatban előbb lefuttatja a bemelegites()-t, utána elindítja a streamlitet
+(az interface.py ugyanazokat a modulokat, és így ugyanazokat a gyorsítótárakat használja).
+A --csak-bemelegites kapcsolóval csak a lépések idejét írja ki.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+from metrikak import meres
+
+PROJEKT_MAPPA = os.path.dirname(os.path.abspath(__file__))
+
+_hatter_szal = None
+_hatter_zar = threading.Lock()
+
+
+def bemelegites(motor=None):
+    """A helységnévtár, a magyar ábécérend, a háttértérkép (raszter és statikus PNG), a ranglista
+    rangsor-indexe és a megoldó nyitó tippje. Visszatérési érték: lépésenként az idő ms-ben."""
+
+    idok = {}
+
+    def lepes(nev, fv):
+        kezdet = time.perf_counter()
+        with meres(f"bemelegites_{nev}"):
+            eredmeny = fv()
+        idok[nev] = (time.perf_counter() - kezdet) * 1000
+        return eredmeny
+
+    from betoltes import koordinata_oszlopok
+    from helysegnevtar import helysegnevtar_betoltese
+
+    motor = motor or os.environ.get("BALATON_TAVOLSAG_MOTOR", "geodesic")
+    oszlopok = lepes("betoltes", koordinata_oszlopok)
+    nevtar = lepes("nevtar", lambda: helysegnevtar_betoltese(oszlopok, motor=motor))
+
+    from rendezes import rendezett_opciok
+
+    lepes("rendezes", lambda: rendezett_opciok(nevtar))
+
+    from alapterkep import alapterkep
+    from elo_terkep import alapterkep_fajl
+
+    kiterjedes = lepes("terbeli_index", lambda: nevtar.terbeli_index.kiterjedes())
+    lepes("alapterkep", lambda: alapterkep(kiterjedes))
+    lepes("alapterkep_fajl", lambda: alapterkep_fajl(kiterjedes))
+
+    from ranglista_index import megosztott_ranglista
+
+    lepes("ranglista", megosztott_ranglista)
+
+    from megoldo import nyito_tipp
+
+    lepes("megoldo", lambda: nyito_tipp(nevtar))
+    return idok
+
+
+def _hatter_bemelegites(motor):
+    try:
+        bemelegites(motor)
+    except Exception:
+        pass  # a bemelegítés csak gyorsítás: hiba esetén a játék az első használatkor tölt be
+
+
+def hatter_bemelegites_inditasa(motor=None):
+    """A bemelegites() elindítása (folyamatonként egyszer) egy háttérszálban."""
+
+    global _hatter_szal
+
+    with _hatter_zar:
+        if _hatter_szal is None:
+            _hatter_szal = threading.Thread(
+                target=_hatter_bemelegites, args=(motor,), name="bemelegites", daemon=True
+            )
+            _hatter_szal.start()
+        return _hatter_szal
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="A gyorsítótárak feltöltése, utána a streamlit szerver indítása."
+    )
+    parser.add_argument("--csak-bemelegites", action="store_true")
+    parser.add_argument("--motor", default=None)
+    args, streamlit_kapcsolok = parser.parse_known_args()
+
+    # a .streamlit/config.toml, a static/ mappa és a ranglista adatbázisa a projekt mappához relatív,
+    # ugyanúgy, mint a "streamlit run interface.py" indításakor
+    os.chdir(PROJEKT_MAPPA)
+    kezdet = time.perf_counter()
+    idok = bemelegites(args.motor)
+    for nev, ms in idok.items():
+        print(f"{nev:16s} {ms:9.1f} ms")
+    print(f"{'összesen':16s} {(time.perf_counter() - kezdet) * 1000:9.1f} ms", flush=True)
+    if args.csak_bemelegites:
+        return
+
+    # ugyanaz, mint a "streamlit run interface.py ...", csak ebben a (már meleg) folyamatban
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", os.path.join(PROJEKT_MAPPA, "interface.py"), *streamlit_kapcsolok]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
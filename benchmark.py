@@ -0,0 +1,442 @@
+"""Reprodukálható teljesítménymérés (hálózat nélkül, a csomagolt coordinates.xlsx-en).
+
+Külön méri a játék fő lépéseit:
+
+- a helységnévtár betöltését (a régi pd.read_excel út, az npz gyorsítótár hidegen és melegen,
+  illetve a folyamaton belüli memo),
+- egy és sok jatek() hívást,
+- a legördülő lista rendezését,
+- a terkep() képét 1, 10 és 40 tippelt várossal (és a háttértérkép egyszeri kirajzolását),
+- a kompetitív játék végi ranglista utat 1 ezer, 100 ezer és 1 millió soros ranglistával
+  (a régi csv + háromszori rendezés, illetve a jelenlegi SQLite + rangsor-index),
+- a szerver indulását friss Python folyamatokban: az interface.py importját, a bemelegítést
+  (bemelegites.py), valamint az első játékos első tippjét (az interface.py futása, az "Egyszerű
+  játék" gomb és egy tipp elküldése, streamlit AppTest-tel) bemelegítés nélkül és bemelegítés
+  után. Ez a projekt mappa ideiglenes másolatában fut, az éles ranglistát és static/ mappát nem
+  érinti.
+
+Az eredmény géppel olvasható JSON. Egy korábbi eredményhez (alapvonalhoz) hasonlítva kiírja,
+melyik mérés lassult a megadott küszöbnél jobban, és ilyenkor 1-es kilépési kóddal áll meg:
+
+    python benchmark.py --kimenet alap.json
+    python benchmark.py --osszehasonlitas alap.json --kuszob 0.2
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import betoltes
+from helysegnevtar import Helysegnevtar, helysegnevtar_betoltese
+from jatekmotor import jatek, uzenet
+
+RANGLISTA_MERETEK = (1_000, 100_000, 1_000_000)
+TERKEP_TIPPEK = (1, 10, 40)
+
+
+def meres(fv, ismetles=5, bemelegites=1):
+    """fv() futási ideje: medián, minimum és maximum ms-ben."""
+
+    for _ in range(bemelegites):
+        fv()
+    idok = []
+    for _ in range(ismetles):
+        kezdet = time.perf_counter()
+        fv()
+        idok.append((time.perf_counter() - kezdet) * 1000)
+    return {
+        "median_ms": statistics.median(idok),
+        "min_ms": min(idok),
+        "max_ms": max(idok),
+        "ismetles": ismetles,
+    }
+
+
+def betoltes_meresek(eredmenyek):
+    import pandas as pd
+
+    eredmenyek["betoltes.read_excel_regi"] = meres(
+        lambda: betoltes._tisztitas(pd.read_excel(betoltes.ALAP_XLSX)), ismetles=5
+    )
+
+    eredeti_mappa = betoltes.CACHE_MAPPA
+    ideiglenes = tempfile.mkdtemp(prefix="benchmark_cache_")
+    try:
+        betoltes.CACHE_MAPPA = ideiglenes
+
+        def hideg():
+            shutil.rmtree(ideiglenes, ignore_errors=True)
+            betoltes.xlsx_betoltese(betoltes.ALAP_XLSX)
+
+        eredmenyek["betoltes.npz_hideg"] = meres(hideg, ismetles=5)
+        betoltes.xlsx_betoltese(betoltes.ALAP_XLSX)
+        eredmenyek["betoltes.npz_meleg"] = meres(
+            lambda: betoltes.xlsx_betoltese(betoltes.ALAP_XLSX), ismetles=20
+        )
+    finally:
+        betoltes.CACHE_MAPPA = eredeti_mappa
+        shutil.rmtree(ideiglenes, ignore_errors=True)
+
+    eredmenyek["betoltes.memo"] = meres(
+        lambda: betoltes.koordinatak_betoltese(betoltes.ALAP_XLSX), ismetles=1000
+    )
+
+    coordinates = betoltes.koordinatak_betoltese(betoltes.ALAP_XLSX)
+    eredmenyek["helysegnevtar.felepites"] = meres(
+        lambda: Helysegnevtar.tablazatbol(coordinates), ismetles=3
+    )
+
+
+def jatek_meresek(eredmenyek, nevtar):
+    veletlen = random.Random(0)
+    n = len(nevtar)
+    parok = [(veletlen.randrange(n), veletlen.randrange(n)) for _ in range(10_000)]
+    gep, tipp = nevtar.varosok[parok[0][0]], nevtar.varosok[parok[0][1]]
+
+    eredmenyek["jatek.egy_hivas"] = meres(lambda: jatek(tipp, nevtar, gep), ismetles=1000)
+    eredmenyek["jatek.10000_hivas"] = meres(
+        lambda: [uzenet(nevtar, g, t) for g, t in parok], ismetles=5
+    )
+
+
+def rendezes_meresek(eredmenyek, nevtar):
+    import locale
+
+    from rendezes import magyar_kulcs, rendezett_opciok
+
+    def locale_regi():
+        locale.setlocale(locale.LC_COLLATE, "")
+        sorted(nevtar.varosok, key=locale.strxfrm)
+
+    eredmenyek["rendezes.locale_regi"] = meres(locale_regi, ismetles=200)
+    eredmenyek["rendezes.magyar_kulcs"] = meres(
+        lambda: sorted(nevtar.varosok, key=magyar_kulcs), ismetles=200
+    )
+    eredmenyek["rendezes.gyorsitotarbol"] = meres(
+        lambda: rendezett_opciok(nevtar), ismetles=1000
+    )
+
+
+def terkep_meresek(eredmenyek, nevtar):
+    import alapterkep
+
+    try:
+        alapterkep.alapterkep.cache_clear()
+        kezdet = time.perf_counter()
+        alapterkep.alapterkep()
+        eredmenyek["terkep.alapterkep_egyszeri"] = {
+            "median_ms": (time.perf_counter() - kezdet) * 1000,
+            "ismetles": 1,
+        }
+    except Exception as hiba:  # pl. nincs Natural Earth adat és hálózat sem
+        eredmenyek["terkep.alapterkep_egyszeri"] = {"kihagyva": repr(hiba)}
+        return
+
+    for darab in TERKEP_TIPPEK:
+        tippek = tuple(
+            sorted((varos, *nevtar.koordinatak(varos)) for varos in nevtar.varosok[:darab])
+        )
+        # a __wrapped__ megkerüli a PNG gyorsítótárat, így a tényleges rajzolást mérjük
+        eredmenyek[f"terkep.{darab}_tipp"] = meres(
+            lambda: alapterkep.terkep_png.__wrapped__(tippek), ismetles=5
+        )
+        eredmenyek[f"terkep.{darab}_tipp_gyorsitotarbol"] = meres(
+            lambda: alapterkep.terkep_png(tippek), ismetles=1000
+        )
+
+
+# friss folyamatban fut (a projekt mappából), és a mért időt írja ki ms-ben
+_ELSO_JATEK = """
+import time
+from streamlit.testing.v1 import AppTest
+{elokeszites}
+kezdet = time.perf_counter()
+at = AppTest.from_file("interface.py", default_timeout=120).run()
+[gomb for gomb in at.button if gomb.label == "Egyszerű játék"][0].click().run()
+at.selectbox[0].select(at.selectbox[0].options[1]).run()
+[gomb for gomb in at.button if gomb.label == "Küldés"][0].click().run()
+assert not at.exception, at.exception
+print((time.perf_counter() - kezdet) * 1000)
+"""
+
+_INDITAS_KOD = {
+    "import_interface": """
+import time
+kezdet = time.perf_counter()
+import interface
+print((time.perf_counter() - kezdet) * 1000)
+""",
+    "bemelegites_hideg": """
+import time
+import interface
+from bemelegites import bemelegites
+kezdet = time.perf_counter()
+bemelegites()
+print((time.perf_counter() - kezdet) * 1000)
+""",
+    # az első játékos valódi útja: az interface.py futása a streamlit AppTest-tel, majd az
+    # "Egyszerű játék" gomb és az első tipp (helységnévtár, legördülő lista, háttértérkép, terkep())
+    "elso_jatek_hidegen": _ELSO_JATEK.format(elokeszites=""),
+    "elso_jatek_bemelegites_utan": _ELSO_JATEK.format(
+        elokeszites="from bemelegites import bemelegites\nbemelegites()"
+    ),
+}
+
+
+# a projekt mappa ideiglenes másolatából ezeket kihagyjuk: az éles állapotot (ranglista, régi csv,
+# eseménynapló, gyorsítótárak, static/ képek) a mérés nem olvashatja és nem írhatja
+_MASOLATBOL_KIHAGYVA = (
+    ".git",
+    ".cache",
+    "static",
+    "__pycache__",
+    "*.sqlite3*",
+    "*.csv",
+    "*.jsonl",
+    "benchmark_eredmeny.json",
+)
+
+
+def _projekt_masolat(cel):
+    projekt_mappa = os.path.dirname(os.path.abspath(__file__))
+    shutil.copytree(projekt_mappa, cel, ignore=shutil.ignore_patterns(*_MASOLATBOL_KIHAGYVA))
+    return cel
+
+
+def inditas_meresek(eredmenyek, ismetles=5):
+    # a BALATON_* beállítások (pl. eseménynapló, metrika napló) se mutassanak éles fájlokra
+    kornyezet = {k: v for k, v in os.environ.items() if not k.startswith("BALATON_")}
+    with tempfile.TemporaryDirectory() as mappa:
+        projekt = _projekt_masolat(os.path.join(mappa, "projekt"))
+
+        def futtatas(kod):
+            return subprocess.run(
+                [sys.executable, "-c", kod],
+                cwd=projekt,
+                env=kornyezet,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+
+        # az npz gyorsítótár és a static/ háttérkép egyszeri elkészítése (egy telepített szerveren
+        # ezek az első indítás után már megvannak), hogy minden ismétlés ugyanazt mérje
+        futtatas("from bemelegites import bemelegites; bemelegites()")
+
+        for nev, kod in _INDITAS_KOD.items():
+            idok = [float(futtatas(kod).split()[-1]) for _ in range(ismetles)]
+            eredmenyek[f"inditas.{nev}"] = {
+                "median_ms": statistics.median(idok),
+                "min_ms": min(idok),
+                "max_ms": max(idok),
+                "ismetles": ismetles,
+            }
+
+
+def _ranglista_sorok(darab, seed=0):
+    veletlen = random.Random(seed)
+    for i in range(darab):
+        yield (
+            f"jatekos{i}",
+            round(veletlen.uniform(20, 900), 3),
+            veletlen.randint(3, 40),
+            1.6e9 + i,
+            "2025-01-01 12:00:00",
+        )
+
+
+def ranglista_meresek(eredmenyek, meretek):
+    import pandas as pd
+
+    from ranglista import OSZLOPOK, Ranglista
+    from ranglista_index import RanglistaIndex
+
+    mappa = tempfile.mkdtemp(prefix="benchmark_ranglista_")
+    try:
+        for darab in meretek:
+            ismetles = 3 if darab >= 1_000_000 else 5
+
+            # a régi út: sor hozzáfűzése a csv-hez, a teljes fájl beolvasása és háromszori rendezés
+            csv_fajl = os.path.join(mappa, f"ranglista_{darab}.csv")
+            with open(csv_fajl, "w", newline="", encoding="utf-8") as f:
+                iro = csv.writer(f)
+                iro.writerow(OSZLOPOK)
+                iro.writerows(_ranglista_sorok(darab))
+            szamlalo = [0]
+
+            def regi_ut():
+                szamlalo[0] += 1
+                start_time = 2e9 + szamlalo[0]
+                with open(csv_fajl, "a", newline="", encoding="utf-8") as f:
+                    csv.writer(f).writerow(["uj", 300.0, 12, start_time, "most"])
+                ranglista = pd.read_csv(csv_fajl)
+                ido = ranglista.sort_values(["Össz. idő (mp)", "Össz. tipp szám"]).reset_index()
+                ido[ido["start_time"] == start_time].index[0]
+                tipp = ranglista.sort_values(["Össz. tipp szám", "Össz. idő (mp)"]).reset_index()
+                tipp[tipp["start_time"] == start_time].index[0]
+                ranglista.sort_values(["Össz. idő (mp)", "Össz. tipp szám"]).reset_index().head(10)
+
+            eredmenyek[f"ranglista.{darab}.csv_regi"] = meres(
+                regi_ut, ismetles=ismetles, bemelegites=0
+            )
+
+            # a jelenlegi út: beszúrás az adatbázisba, helyezések és TOP10 a rangsor-indexből
+            adatbazis = Ranglista(os.path.join(mappa, f"ranglista_{darab}.sqlite3"))
+            with adatbazis._kapcsolat() as kapcsolat:
+                kapcsolat.executemany(
+                    "INSERT INTO eredmenyek (jatekosnev, ossz_ido, ossz_tipp, start_time, mikor_jatszott)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    _ranglista_sorok(darab),
+                )
+
+            kezdet = time.perf_counter()
+            index = RanglistaIndex(adatbazis)
+            eredmenyek[f"ranglista.{darab}.index_felepites"] = {
+                "median_ms": (time.perf_counter() - kezdet) * 1000,
+                "ismetles": 1,
+            }
+
+            def uj_ut():
+                azonosito = index.hozzaad("uj", 300.0, 12, time.time(), "most")
+                index.helyezesek(azonosito)
+                index.top(10)
+
+            eredmenyek[f"ranglista.{darab}.sqlite_index"] = meres(uj_ut, ismetles=ismetles * 4)
+
+            def sqlite_count():
+                azonosito = adatbazis.hozzaad("uj", 300.0, 12, time.time(), "most")
+                adatbazis.helyezesek(azonosito)
+                adatbazis.top(10)
+
+            eredmenyek[f"ranglista.{darab}.sqlite_count"] = meres(sqlite_count, ismetles=ismetles)
+    finally:
+        shutil.rmtree(mappa, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def futtatas(reszek, ranglista_meretek):
+    eredmenyek = {}
+    coordinates = betoltes.koordinatak_betoltese(betoltes.ALAP_XLSX)
+    nevtar = helysegnevtar_betoltese(coordinates)
+
+    if "betoltes" in reszek:
+        betoltes_meresek(eredmenyek)
+    if "jatek" in reszek:
+        jatek_meresek(eredmenyek, nevtar)
+    if "rendezes" in reszek:
+        rendezes_meresek(eredmenyek, nevtar)
+    if "terkep" in reszek:
+        terkep_meresek(eredmenyek, nevtar)
+    if "ranglista" in reszek:
+        ranglista_meresek(eredmenyek, ranglista_meretek)
+    if "inditas" in reszek:
+        inditas_meresek(eredmenyek)
+
+    return {
+        "meta": {
+            "datum": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "telepulesek": len(nevtar),
+        },
+        "eredmenyek": eredmenyek,
+    }
+
+
+def osszehasonlitas(uj, alap, kuszob, min_kulonbseg_ms=0.5):
+    """A medián idők összevetése az alapvonallal. Visszaadja a lassult mérések listáját
+    (név, alap ms, új ms, arány). A min_kulonbseg_ms-nél kisebb abszolút eltérés mérési zajnak
+    számít, és nem jelezzük."""
+
+    lassulasok = []
+    for nev, meret in uj["eredmenyek"].items():
+        regi = alap["eredmenyek"].get(nev)
+        if not regi or "median_ms" not in regi or "median_ms" not in meret:
+            continue
+        arany = meret["median_ms"] / regi["median_ms"] if regi["median_ms"] else float("inf")
+        if arany > 1 + kuszob and meret["median_ms"] - regi["median_ms"] >= min_kulonbseg_ms:
+            lassulasok.append((nev, regi["median_ms"], meret["median_ms"], arany))
+    return lassulasok
+
+
+def _kiiras(eredmeny):
+    for nev, meret in eredmeny["eredmenyek"].items():
+        if "median_ms" in meret:
+            print(f"{nev:45s} {meret['median_ms']:12.3f} ms  (n={meret['ismetles']})")
+        else:
+            print(f"{nev:45s} kihagyva: {meret.get('kihagyva')}")
+
+
+RESZEK = ("betoltes", "jatek", "rendezes", "terkep", "ranglista", "inditas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kimenet", default="benchmark_eredmeny.json")
+    parser.add_argument("--reszek", default=",".join(RESZEK), help="vesszővel elválasztva")
+    parser.add_argument(
+        "--ranglista-meretek",
+        default=",".join(map(str, RANGLISTA_MERETEK)),
+        help="vesszővel elválasztva (pl. 1000,100000 a gyors futáshoz)",
+    )
+    parser.add_argument("--osszehasonlitas", help="korábbi eredmény (alapvonal) JSON fájlja")
+    parser.add_argument(
+        "--kuszob", type=float, default=0.2, help="megengedett relatív lassulás (0.2 = 20%%)"
+    )
+    parser.add_argument(
+        "--min-kulonbseg",
+        type=float,
+        default=0.5,
+        help="ennél kisebb abszolút lassulást (ms) nem jelzünk, mert mérési zaj",
+    )
+    args = parser.parse_args()
+
+    reszek = set(args.reszek.split(","))
+    ismeretlen = reszek - set(RESZEK)
+    if ismeretlen:
+        parser.error(f"ismeretlen rész: {', '.join(sorted(ismeretlen))}")
+    meretek = [int(m) for m in args.ranglista_meretek.split(",") if m]
+
+    eredmeny = futtatas(reszek, meretek)
+    _kiiras(eredmeny)
+    with open(args.kimenet, "w", encoding="utf-8") as f:
+        json.dump(eredmeny, f, ensure_ascii=False, indent=2)
+    print(f"\nEredmény kiírva: {args.kimenet}")
+
+    if args.osszehasonlitas:
+        with open(args.osszehasonlitas, encoding="utf-8") as f:
+            alap = json.load(f)
+        lassulasok = osszehasonlitas(eredmeny, alap, args.kuszob, args.min_kulonbseg)
+        if lassulasok:
+            print(f"\nLassulás (> {args.kuszob:.0%}) az alapvonalhoz képest:")
+            for nev, regi, uj, arany in lassulasok:
+                print(f"  {nev:45s} {regi:10.3f} ms -> {uj:10.3f} ms  ({arany:.2f}x)")
+            sys.exit(1)
+        print(f"\nNincs {args.kuszob:.0%}-nál nagyobb lassulás az alapvonalhoz képest.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""A települések koordinátáit tartalmazó táblázat (coordinates.xlsx) betöltése.
+
+Elsőként mindig a csomaggal együtt szállított, helyi xlsx fájlt olvassuk. Ezt egyszer átalakítjuk
+egy gyors bináris (npz) gyorsítótárba, amelynek a neve a fájl tartalmának hash-ét tartalmazza,
+így az Excel értelmezése csak akkor fut le újra, ha a táblázat ténylegesen megváltozott.
+A pandast csak az xlsx értelmezéséhez és a DataFrame-et kérő hívóknak töltjük be: a játék a
+koordinata_oszlopok()-at használja, ami az npz-ből közvetlenül numpy tömböket ad, így meleg
+gyorsítótárnál a szerver indulásakor a pandas importja (több száz ms) teljesen kimarad.
+A GitHubról való frissítés opcionális: háttérszálban fut, feltételes kérésekkel (ETag /
+If-Modified-Since), tehát a streamlit újrafuttatásai sosem várnak a hálózatra, és internet
+nélkül is működik a játék.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from io import BytesIO
+
+import numpy as np
+
+from metrikak import meres
+
+PROJEKT_MAPPA = os.path.dirname(os.path.abspath(__file__))
+ALAP_XLSX = os.path.join(PROJEKT_MAPPA, "coordinates.xlsx")
+CACHE_MAPPA = os.path.join(PROJEKT_MAPPA, ".cache")
+TAVOLI_XLSX = os.path.join(CACHE_MAPPA, "coordinates_tavoli.xlsx")
+TAVOLI_META = os.path.join(CACHE_MAPPA, "coordinates_tavoli.json")
+TAVOLI_URL = "https://raw.githubusercontent.com/nlemu/prog1-projekt-vegleges/main/coordinates.xlsx"
+
+# (útvonal, mtime, méret) -> DataFrame / oszlopok, hogy egy újrafuttatásnál még a hash számolása se kelljen
+_memo = {}
+_oszlop_memo = {}
+_memo_zar = threading.Lock()
+
+_frissito_szal = None
+_frissito_zar = threading.Lock()
+
+
+def tartalom_hash(adat):
+    """Visszaadja a fájl tartalmának rövid (16 karakteres) sha256 hash-ét."""
+
+    return hashlib.sha256(adat).hexdigest()[:16]
+
+
+def _tisztitas(tabla):
+    """A csomagolt xlsx-ben a koordináták már számok (float64), a pd.to_numeric csak biztosíték
+    arra az esetre, ha egy (pl. a GitHubról frissített) táblázatban szövegként érkeznének.
+    A településnevek elejéről és végéről levágjuk a szóközöket, és eldobjuk az üres sorokat."""
+
+    import pandas as pd
+
+    tabla = tabla.dropna(subset=["Város"]).copy()
+    tabla["Város"] = tabla["Város"].astype(str).str.strip()
+    tabla["latitude"] = pd.to_numeric(tabla["latitude"])
+    tabla["longitude"] = pd.to_numeric(tabla["longitude"])
+    return tabla[["Város", "latitude", "longitude"]].reset_index(drop=True)
+
+
+def _npz_utvonal(hash_ertek):
+    return os.path.join(CACHE_MAPPA, f"coordinates_{hash_ertek}.npz")
+
+
+def _npz_oszlopok(utvonal):
+    with np.load(utvonal, allow_pickle=False) as npz:
+        return tuple(npz["varos"].tolist()), npz["latitude"], npz["longitude"]
+
+
+def _npz_olvasas(utvonal):
+    import pandas as pd
+
+    varosok, latitude, longitude = _npz_oszlopok(utvonal)
+    return pd.DataFrame({"Város": list(varosok), "latitude": latitude, "longitude": longitude})
+
+
+def _npz_iras(tabla, utvonal):
+    """Atomikusan írja ki a gyorsítótárat (előbb ideiglenes fájlba, utána átnevezés),
+    hogy két párhuzamos folyamat se hagyhasson félkész fájlt maga után."""
+
+    os.makedirs(CACHE_MAPPA, exist_ok=True)
+    ideiglenes = f"{utvonal}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(ideiglenes, "wb") as f:
+        np.savez(
+            f,
+            varos=np.array(tabla["Város"].tolist(), dtype=str),
+            latitude=tabla["latitude"].to_numpy(dtype=np.float64),
+            longitude=tabla["longitude"].to_numpy(dtype=np.float64),
+        )
+    os.replace(ideiglenes, utvonal)
+
+
+def xlsx_betoltese(utvonal):
+    """Egy adott xlsx fájl betöltése a hash alapú npz gyorsítótáron keresztül."""
+
+    with open(utvonal, "rb") as f:
+        adat = f.read()
+    npz = _npz_utvonal(tartalom_hash(adat))
+
+    if os.path.isfile(npz):
+        try:
+            return _npz_olvasas(npz)
+        except (OSError, ValueError, KeyError):
+            pass  # sérült gyorsítótár --> újraépítjük az xlsx-ből
+
+    import pandas as pd
+
+    with meres("xlsx"):
+        tabla = _tisztitas(pd.read_excel(BytesIO(adat)))
+    try:
+        _npz_iras(tabla, npz)
+    except OSError:
+        pass  # írásvédett telepítésnél gyorsítótár nélkül is működünk
+    return tabla
+
+
+def aktualis_forras():
+    """A letöltött (frissebb) táblázatot használjuk, ha van ilyen, egyébként a csomagolt fájlt."""
+
+    return TAVOLI_XLSX if os.path.isfile(TAVOLI_XLSX) else ALAP_XLSX
+
+
+def koordinatak_betoltese(utvonal=None):
+    """A játékhoz szükséges koordináta táblázat (Város, latitude, longitude oszlopokkal).
+
+    Egy folyamaton belül a fájl módosítási ideje és mérete alapján memóriában is eltároljuk,
+    így a streamlit újrafuttatásai egy stat() hívásba kerülnek csak.
+    """
+
+    utvonal = utvonal or aktualis_forras()
+    allapot = os.stat(utvonal)
+    kulcs = (utvonal, allapot.st_mtime_ns, allapot.st_size)
+
+    with _memo_zar:
+        if kulcs in _memo:
+            return _memo[kulcs]
+
+    tabla = xlsx_betoltese(utvonal)
+
+    with _memo_zar:
+        _memo.clear()  # csak a legfrissebb változatot tartjuk meg
+        _memo[kulcs] = tabla
+    return tabla
+
+
+def koordinata_oszlopok(utvonal=None):
+    """Ugyanaz a táblázat pandas nélkül: (településnevek tuple-je, latitude, longitude tömbök).
+
+    Ha az xlsx-hez már van npz gyorsítótár, csak azt olvassa (pandas import nélkül), egyébként
+    egyszer a koordinatak_betoltese() útján értelmezi az xlsx-et. A koordinatak_betoltese()-hez
+    hasonlóan folyamaton belül is eltárolja, ugyanazt a tuple objektumot adja vissza, amíg a
+    fájl nem változik (a helysegnevtar_betoltese() erre építve gyorsítótáraz).
+    """
+
+    utvonal = utvonal or aktualis_forras()
+    allapot = os.stat(utvonal)
+    kulcs = (utvonal, allapot.st_mtime_ns, allapot.st_size)
+
+    with _memo_zar:
+        if kulcs in _oszlop_memo:
+            return _oszlop_memo[kulcs]
+
+    with open(utvonal, "rb") as f:
+        npz = _npz_utvonal(tartalom_hash(f.read()))
+    oszlopok = None
+    if os.path.isfile(npz):
+        try:
+            oszlopok = _npz_oszlopok(npz)
+        except (OSError, ValueError, KeyError):
+            pass  # sérült gyorsítótár --> az xlsx_betoltese() újraépíti
+    if oszlopok is None:
+        tabla = koordinatak_betoltese(utvonal)
+        oszlopok = (
+            tuple(tabla["Város"].tolist()),
+            tabla["latitude"].to_numpy(dtype=np.float64),
+            tabla["longitude"].to_numpy(dtype=np.float64),
+        )
+
+    with _memo_zar:
+        _oszlop_memo.clear()
+        _oszlop_memo[kulcs] = oszlopok
+    return oszlopok
+
+
+def _meta_olvasas():
+    try:
+        with open(TAVOLI_META, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def tavoli_frissites(session=None, timeout=10):
+    """Egyszeri feltételes letöltés a GitHubról. Ha a fájl nem változott (304), nem tölt le semmit.
+
+    Az új fájlt csak akkor teszi a helyére, ha sikerült értelmezni, így egy hibás letöltés
+    nem ronthatja el a játékot. Visszatérési érték: True, ha új táblázat került a gyorsítótárba.
+    """
+
+    import pandas as pd
+    import requests
+
+    session = session or requests.Session()
+    meta = _meta_olvasas()
+    fejlecek = {}
+    if os.path.isfile(TAVOLI_XLSX):
+        if meta.get("etag"):
+            fejlecek["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            fejlecek["If-Modified-Since"] = meta["last_modified"]
+
+    with meres("letoltes"):
+        valasz = session.get(TAVOLI_URL, headers=fejlecek, timeout=timeout)
+    if valasz.status_code == 304:
+        return False
+    valasz.raise_for_status()
+
+    _tisztitas(pd.read_excel(BytesIO(valasz.content)))  # ellenőrzés: értelmezhető-e
+
+    os.makedirs(CACHE_MAPPA, exist_ok=True)
+    ideiglenes = f"{TAVOLI_XLSX}.{os.getpid()}.tmp"
+    with open(ideiglenes, "wb") as f:
+        f.write(valasz.content)
+    os.replace(ideiglenes, TAVOLI_XLSX)
+
+    with open(TAVOLI_META, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "etag": valasz.headers.get("ETag"),
+                "last_modified": valasz.headers.get("Last-Modified"),
+                "letoltve": time.time(),
+            },
+            f,
+        )
+    return True
+
+
+def _frissito_ciklus(intervallum):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+    while True:
+        try:
+            tavoli_frissites(session)
+        except Exception:
+            pass  # hálózati hiba esetén marad a meglévő táblázat, később újra próbáljuk
+        time.sleep(intervallum)
+
+
+def hatter_frissites_inditasa(intervallum=3600):
+    """Elindítja (folyamatonként egyszer) a háttérben futó távoli frissítést."""
+
+    global _frissito_szal
+
+    with _frissito_zar:
+        if _frissito_szal is not None and _frissito_szal.is_alive():
+            return _frissito_szal
+        _frissito_szal = threading.Thread(
+            target=_frissito_ciklus,
+            args=(intervallum,),
+            name="koordinata-frissito",
+            daemon=True,
+        )
+        _frissito_szal.start()
+        return _frissito_szal
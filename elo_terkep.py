@@ -0,0 +1,105 @@
+"""Könnyű, tippenként frissülő térkép: a háttértérkép egy statikus PNG, amit a böngésző egyszer
+tölt le és gyorsítótáraz, fölötte pedig egy kis SVG réteg mutatja a tippelt városokat (pont, név
+és egy vonal az előző tipphez).
+
+A PNG-t a streamlit statikus fájlkiszolgálója adja (.streamlit/config.toml: enableStaticServing,
+a fájl a static/ mappában van, az URL-je app/static/...). A háttérkép az alapterkep()
+raszteréből készül (a csomagolt balaton_geometria.npz-ből, vagy ha az nincs meg, cartopyval),
+kiterjedésenként egyszer. A fájlnévben benne van a kiterjedés, a méret és a rajzolás forrásának
+(a geometria fájl tartalmának) hash-e, így ha ezek bármelyike változik, új fájl készül, és a
+böngésző is az új képet kéri le (a streamlit a static/ fájlokat "Cache-Control: public"-kal adja). Egy tipp után a szerver csak az SVG
+szöveget állítja elő (néhány száz bájt, a tippek sorozata szerint gyorsítótárazva).
+
+A teljes, szerveren rajzolt PNG (alapterkep.terkep_png) továbbra is megmarad statikus exportra,
+és akkor is azt használjuk, ha a statikus kiszolgálás nincs bekapcsolva, vagy a static/ mappa nem írható
+(lásd interface.terkep).
+"""
+
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from html import escape
+
+from alapterkep import DPI, KITERJEDES, MERET, alapterkep, rajzolo_azonosito
+
+STATIC_MAPPA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+
+PONT_SUGAR = 5
+BETUMERET = 11
+
+_fajl_zar = threading.Lock()
+
+
+def alapterkep_fajlnev(kiterjedes=KITERJEDES):
+    kulcs = repr((tuple(kiterjedes), MERET, DPI, rajzolo_azonosito())).encode("utf-8")
+    return f"alapterkep_{hashlib.sha256(kulcs).hexdigest()[:12]}.png"
+
+
+@lru_cache(maxsize=4)
+def alapterkep_fajl(kiterjedes=KITERJEDES):
+    """A háttértérkép PNG-je a static/ mappában (ha még nincs ott, most rajzoljuk ki).
+    Visszatérési érték: (URL a böngészőnek, szélesség, magasság pixelben), vagy None, ha a
+    fájlt nem sikerült kiírni (pl. írásvédett telepítés); ilyenkor az interface.terkep() a
+    szerveren rajzolt PNG-t mutatja."""
+
+    from matplotlib.image import imread, imsave
+
+    fajlnev = alapterkep_fajlnev(kiterjedes)
+    utvonal = os.path.join(STATIC_MAPPA, fajlnev)
+    with _fajl_zar:
+        if os.path.isfile(utvonal):
+            magassag, szelesseg = imread(utvonal).shape[:2]
+        else:
+            raszter = alapterkep(kiterjedes)
+            magassag, szelesseg = raszter.shape[:2]
+            ideiglenes = f"{utvonal}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(STATIC_MAPPA, exist_ok=True)
+                imsave(ideiglenes, raszter, format="png")
+                os.replace(ideiglenes, utvonal)
+            except OSError:
+                if os.path.exists(ideiglenes):
+                    os.remove(ideiglenes)
+                return None
+    return f"{STATIC_URL}/{fajlnev}", szelesseg, magassag
+
+
+@lru_cache(maxsize=1024)
+def terkep_svg(tippek, kiterjedes=KITERJEDES, vonal=True):
+    """A tippelt városok (név, latitude, longitude) hármasai tippelési sorrendben --> SVG szöveg
+    a háttértérkép fölé (a háttérkép URL-jére hivatkozik, magát a képet nem tartalmazza).
+    Csak akkor hívható, ha az alapterkep_fajl() nem None."""
+
+    url, szelesseg, magassag = alapterkep_fajl(kiterjedes)
+    min_lon, max_lon, min_lat, max_lat = kiterjedes
+
+    def pixel(latitude, longitude):
+        # PlateCarree vetületben a hosszúság/szélesség lineárisan képződik le a raszterre
+        x = (longitude - min_lon) / (max_lon - min_lon) * szelesseg
+        y = (max_lat - latitude) / (max_lat - min_lat) * magassag
+        return round(x, 1), round(y, 1)
+
+    pontok = [(escape(nev), *pixel(lat, lon)) for nev, lat, lon in tippek]
+    reszek = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {szelesseg} {magassag}" '
+        f'width="100%" style="max-width:{szelesseg}px">',
+        f'<image href="{url}" width="{szelesseg}" height="{magassag}"/>',
+    ]
+    if vonal and len(pontok) > 1:
+        koordinatak = " ".join(f"{x},{y}" for _, x, y in pontok)
+        reszek.append(
+            f'<polyline points="{koordinatak}" fill="none" stroke="red" '
+            'stroke-width="1.5" stroke-dasharray="4 3" opacity="0.7"/>'
+        )
+    for i, (nev, x, y) in enumerate(pontok):
+        # az utolsó tipp kicsit nagyobb, hogy látszódjon, hol tart a játékos
+        sugar = PONT_SUGAR + 2 if i == len(pontok) - 1 else PONT_SUGAR
+        reszek.append(f'<circle cx="{x}" cy="{y}" r="{sugar}" fill="red"/>')
+        reszek.append(
+            f'<text x="{x + 8}" y="{y + 4}" font-size="{BETUMERET}" '
+            f'font-family="sans-serif">{nev}</text>'
+        )
+    reszek.append("</svg>")
+    return "".join(reszek)
@@ -0,0 +1,372 @@
+"""Csak hozzáfűzhető eseménynapló a játékokról (JSON sorok), és ebből folyamatosan frissíthető
+összesített statisztika.
+
+Eddig csak a befejezett kompetitív játékok eredménye maradt meg (egy sor a ranglistában). Itt
+minden játék minden lépése egy esemény:
+
+- "kezdet": új játék (korok száma, játékosnév, nehézség); az első tippnél íródik ki, mert az
+  egyszerű játék menete már az oldal megjelenésekor létrejön,
+- "tipp": egy tipp (kör, hányadik tipp a körben, a gép gondolata, a tipp, talált-e),
+- "kor_vege": egy kör vége (a gép gondolata, tippek száma, idő mp-ben),
+- "jatek_vege": a játék vége (összes idő és tipp, játékosnév, start_time, mikor játszott),
+- "feladva": a játékos új játékot kezdett, mielőtt a régit befejezte volna.
+
+A bezárt lapokról és lejárt munkamenetekről nem jön esemény: a Statisztika azt a játékot is
+feladottnak számolja, amelyik elkezdődött, de FELHAGYASI_IDO óta nem volt benne esemény
+(és nem ért véget).
+
+Minden eseményben benne van a játék azonosítója ("jatek") és az időpont ("ido", unix mp).
+A tippelő szál csak egy sorba teszi az eseményt, a fájlba egy háttérszál ír kötegekben (egy
+os.write() hívással, O_APPEND módban, így több szerverfolyamat is írhat ugyanabba a fájlba).
+
+A Statisztika a naplót csak egyszer olvassa végig: az állapotát a fájlbeli pozícióval együtt
+el lehet menteni, és legközelebb csak az azóta hozzáfűzött sorokat dolgozza fel. A naplóból
+a ranglista is újraépíthető:
+
+    python esemenynaplo.py statisztika esemenyek.jsonl --allapot statisztika.json
+    python esemenynaplo.py ranglista esemenyek.jsonl uj_ranglista.sqlite3
+"""
+
+import argparse
+import atexit
+import json
+import math
+import os
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+
+ESEMENYNAPLO = os.environ.get("BALATON_ESEMENYNAPLO", "esemenyek.jsonl")
+
+KOTEG_MERET = 1000  # ennyi eseményt írunk ki egyszerre legfeljebb
+KIIRAS_IDOKOZ = 1.0  # mp, ennyi idő után akkor is kiírjuk, ha nem telt meg a köteg
+
+# a megoldási idő hisztogramja: logaritmikus vödrök 0.1 mp-től, 5%-os lépésekkel
+IDO_ALAP = 0.1
+IDO_ARANY = 1.05
+
+# ennyi mp tétlenség után számít egy be nem fejezett játék felhagyottnak (bezárt lap, lejárt munkamenet)
+FELHAGYASI_IDO = 3600
+# ennyi lejártnak számolt játék azonosítóját jegyezzük meg, hogy ha mégis folytatódnak, visszavehessük őket
+FELHAGYOTT_EMLEK = 100_000
+
+
+class EsemenyNaplo:
+    """Kötegekben, háttérszálból író JSON sor napló."""
+
+    def __init__(self, utvonal=ESEMENYNAPLO, koteg_meret=KOTEG_MERET, idokoz=KIIRAS_IDOKOZ):
+        self.utvonal = utvonal
+        self.koteg_meret = koteg_meret
+        self.idokoz = idokoz
+        self._sor = queue.SimpleQueue()
+        self._szal = None
+        self._szal_zar = threading.Lock()
+
+    def esemeny(self, tipus, **adatok):
+        """Egy esemény felvétele. Nem vár a lemezre, a szerializálás is a háttérszálban történik."""
+
+        adatok["e"] = tipus
+        self._sor.put(adatok)
+        if self._szal is None:
+            self._iro_inditasa()
+
+    def _iro_inditasa(self):
+        with self._szal_zar:
+            if self._szal is None:
+                self._szal = threading.Thread(
+                    target=self._iro, name="esemenynaplo-iro", daemon=True
+                )
+                self._szal.start()
+                atexit.register(self.kiurites)
+
+    def _iro(self):
+        while True:
+            koteg = [self._sor.get()]
+            # a köteg legfeljebb idokoz mp-ig gyűlik az első eseménytől számítva (nem az utolsótól),
+            # így folyamatos forgalomnál is legkésőbb ennyi idő múlva lemezre kerül
+            hatarido = time.monotonic() + self.idokoz
+            try:
+                while len(koteg) < self.koteg_meret and not isinstance(koteg[-1], threading.Event):
+                    koteg.append(self._sor.get(timeout=max(0.0, hatarido - time.monotonic())))
+            except queue.Empty:
+                pass
+            # a kiurites() egy threading.Event-et tesz a sorba, ezt a kiírás után jelezzük
+            esemenyek = [e for e in koteg if isinstance(e, dict)]
+            jelzesek = [e for e in koteg if isinstance(e, threading.Event)]
+            if esemenyek:
+                self._iras(esemenyek)
+            for jelzes in jelzesek:
+                jelzes.set()
+
+    def _iras(self, esemenyek):
+        adat = "".join(
+            json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in esemenyek
+        ).encode("utf-8")
+        try:
+            fd = os.open(self.utvonal, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, adat)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass  # a napló hibája miatt ne álljon meg a játék
+
+    def kiurites(self, timeout=5.0):
+        """Megvárja, amíg az eddig felvett események kiíródnak (pl. leállításkor)."""
+
+        if self._szal is None:
+            return True
+        jelzes = threading.Event()
+        self._sor.put(jelzes)
+        return jelzes.wait(timeout)
+
+
+_naplok = {}
+_naplok_zar = threading.Lock()
+
+
+def megosztott_esemenynaplo(utvonal=ESEMENYNAPLO):
+    """A folyamat összes munkamenete által közösen használt napló (fájlonként egy író szál)."""
+
+    with _naplok_zar:
+        naplo = _naplok.get(utvonal)
+        if naplo is None:
+            naplo = _naplok[utvonal] = EsemenyNaplo(utvonal)
+        return naplo
+
+
+def esemenyek_olvasasa(utvonal, pozicio=0):
+    """(esemény, a sor utáni fájlpozíció) párok a pozicio-tól kezdve. A félig kiírt utolsó sort
+    (amihez még nem ért oda az író) kihagyja, azt a következő olvasás dolgozza fel."""
+
+    with open(utvonal, "rb") as f:
+        f.seek(pozicio)
+        for sor in f:
+            if not sor.endswith(b"\n"):
+                return
+            pozicio += len(sor)
+            try:
+                yield json.loads(sor), pozicio
+            except ValueError:
+                continue  # sérült sor (pl. megszakadt írás) --> kihagyjuk
+
+
+class Statisztika:
+    """Folyamatosan frissülő összesítés az eseményekből (a teljes történet újraolvasása nélkül)."""
+
+    def __init__(self):
+        self.pozicio = 0  # eddig ennyi bájtot dolgoztunk fel a naplóból
+        self.esemenyek = Counter()  # típus -> darab
+        self.jatekok = Counter()  # "egyszeru" / "kompetitiv" -> elkezdett játékok
+        self.cel_korok = Counter()  # gép gondolata -> megoldott körök száma
+        self.cel_tippek = Counter()  # gép gondolata -> tippek összege ezekben a körökben
+        self.elso_tippek = Counter()  # a körök első tippje -> darab
+        self.ido_vodrok = Counter()  # a kör megoldási idejének hisztogramja (vödör sorszáma -> darab)
+        # folyamatban lévő játékok: azonosító -> utolsó esemény ideje, a legrégebben aktív elöl
+        self.nyitott = OrderedDict()
+        self.felhagyott = 0  # a FELHAGYASI_IDO alatt esemény nélkül maradt, be nem fejezett játékok
+        self.felhagyott_azonositok = OrderedDict()  # a legutóbb lejártak (legfeljebb FELHAGYOTT_EMLEK)
+
+    def feldolgozas(self, esemeny):
+        """Egy esemény hozzáadása az összesítéshez."""
+
+        tipus = esemeny.get("e")
+        self.esemenyek[tipus] += 1
+        self._nyitott_frissitese(tipus, esemeny.get("jatek"), esemeny.get("ido"))
+        if tipus == "kezdet":
+            self.jatekok["egyszeru" if esemeny.get("korok") == 1 else "kompetitiv"] += 1
+        elif tipus == "tipp":
+            if esemeny.get("n") == 1:
+                self.elso_tippek[esemeny["tipp"]] += 1
+        elif tipus == "kor_vege":
+            self.cel_korok[esemeny["cel"]] += 1
+            self.cel_tippek[esemeny["cel"]] += esemeny["tippek"]
+            self.ido_vodrok[_ido_vodor(esemeny["kor_ido"])] += 1
+
+    def _nyitott_frissitese(self, tipus, jatek, ido):
+        if jatek is None or ido is None:
+            return
+        folytatodott = jatek in self.felhagyott_azonositok
+        if folytatodott:
+            # a lejártnak hitt játék mégis folytatódott: már nem számít felhagyottnak
+            del self.felhagyott_azonositok[jatek]
+            self.felhagyott -= 1
+        if tipus in ("jatek_vege", "feladva"):
+            self.nyitott.pop(jatek, None)
+        elif tipus == "kezdet" or folytatodott or jatek in self.nyitott:
+            self.nyitott[jatek] = ido
+            self.nyitott.move_to_end(jatek)
+        self.lejart_jatekok(ido)
+
+    def lejart_jatekok(self, most):
+        """A most (unix mp) előtt FELHAGYASI_IDO-nél régebben aktív nyitott játékok áthelyezése a
+        felhagyottak közé. A napló időrendben van, így elég a sor elejét nézni."""
+
+        while self.nyitott:
+            jatek, utolso = next(iter(self.nyitott.items()))
+            if most - utolso < FELHAGYASI_IDO:
+                break
+            del self.nyitott[jatek]
+            self.felhagyott += 1
+            self.felhagyott_azonositok[jatek] = utolso
+            if len(self.felhagyott_azonositok) > FELHAGYOTT_EMLEK:
+                self.felhagyott_azonositok.popitem(last=False)
+
+    def fajl_feldolgozasa(self, utvonal):
+        """A napló azóta hozzáfűzött sorainak feldolgozása. Visszaadja a feldolgozott események számát."""
+
+        darab = 0
+        for esemeny, pozicio in esemenyek_olvasasa(utvonal, self.pozicio):
+            self.feldolgozas(esemeny)
+            self.pozicio = pozicio
+            darab += 1
+        return darab
+
+    def atlagos_tippszam(self):
+        """Gép gondolata -> átlagosan hány tippből találták ki."""
+
+        return {cel: self.cel_tippek[cel] / db for cel, db in self.cel_korok.items()}
+
+    def megoldasi_ido_percentilis(self, q):
+        """A körök megoldási idejének q-adik percentilise mp-ben (0 < q < 100), legfeljebb 5%-os
+        hibával (a vödör felső határa)."""
+
+        osszes = sum(self.ido_vodrok.values())
+        if not osszes:
+            return None
+        cel = q / 100 * osszes
+        eddig = 0
+        for vodor in sorted(self.ido_vodrok):
+            eddig += self.ido_vodrok[vodor]
+            if eddig >= cel:
+                return IDO_ALAP * IDO_ARANY ** (vodor + 1)
+        return None
+
+    def leggyakoribb_elso_tippek(self, n=10):
+        return self.elso_tippek.most_common(n)
+
+    def osszefoglalo(self, n=10, most=None):
+        """Az összesítés; a most (alapból a jelenlegi idő) szerint lejárt játékok felhagyottnak számítanak."""
+
+        self.lejart_jatekok(time.time() if most is None else most)
+        atlagok = self.atlagos_tippszam()
+        return {
+            "esemenyek": dict(self.esemenyek),
+            "jatekok": dict(self.jatekok),
+            "befejezett_jatekok": self.esemenyek["jatek_vege"],
+            # kifejezetten feladott (új játék) + esemény nélkül magára hagyott (bezárt lap)
+            "feladott_jatekok": self.esemenyek["feladva"] + self.felhagyott,
+            "felhagyott_jatekok": self.felhagyott,
+            "folyamatban_levo_jatekok": len(self.nyitott),
+            "megoldasi_ido_mp": {
+                f"p{q}": self.megoldasi_ido_percentilis(q) for q in (50, 90, 99)
+            },
+            "leggyakoribb_elso_tippek": self.leggyakoribb_elso_tippek(n),
+            "legnehezebb_celok": sorted(atlagok.items(), key=lambda p: -p[1])[:n],
+            "legkonnyebb_celok": sorted(atlagok.items(), key=lambda p: p[1])[:n],
+        }
+
+    def mentes(self, utvonal):
+        """Az állapot mentése (a fájlpozícióval együtt), atomikusan."""
+
+        allapot = {
+            "pozicio": self.pozicio,
+            "esemenyek": self.esemenyek,
+            "jatekok": self.jatekok,
+            "cel_korok": self.cel_korok,
+            "cel_tippek": self.cel_tippek,
+            "elso_tippek": self.elso_tippek,
+            "ido_vodrok": {str(k): v for k, v in self.ido_vodrok.items()},
+            "nyitott": list(self.nyitott.items()),
+            "felhagyott": self.felhagyott,
+            "felhagyott_azonositok": list(self.felhagyott_azonositok.items()),
+        }
+        ideiglenes = f"{utvonal}.{os.getpid()}.tmp"
+        with open(ideiglenes, "w", encoding="utf-8") as f:
+            json.dump(allapot, f, ensure_ascii=False)
+        os.replace(ideiglenes, utvonal)
+
+    @classmethod
+    def betoltes(cls, utvonal):
+        """Egy korábban mentett állapot betöltése (ha nincs ilyen fájl, üres statisztika)."""
+
+        statisztika = cls()
+        try:
+            with open(utvonal, encoding="utf-8") as f:
+                allapot = json.load(f)
+        except FileNotFoundError:
+            return statisztika
+        statisztika.pozicio = allapot["pozicio"]
+        for mezo in ("esemenyek", "jatekok", "cel_korok", "cel_tippek", "elso_tippek"):
+            setattr(statisztika, mezo, Counter(allapot[mezo]))
+        statisztika.ido_vodrok = Counter({int(k): v for k, v in allapot["ido_vodrok"].items()})
+        statisztika.nyitott = OrderedDict(allapot.get("nyitott", []))
+        statisztika.felhagyott = allapot.get("felhagyott", 0)
+        statisztika.felhagyott_azonositok = OrderedDict(allapot.get("felhagyott_azonositok", []))
+        return statisztika
+
+
+def _ido_vodor(masodperc):
+    if masodperc <= IDO_ALAP:
+        return 0
+    return int(math.log(masodperc / IDO_ALAP) / math.log(IDO_ARANY))
+
+
+def ranglista_ujraepitese(naplo_utvonal, adatbazis, koteg_meret=10_000):
+    """A kompetitív játékok ranglistájának újraépítése a naplóból egy (új) SQLite adatbázisba.
+    Visszaadja a beszúrt eredmények számát."""
+
+    from ranglista import Ranglista
+
+    ranglista = Ranglista(adatbazis)
+    koteg = []
+    osszes = 0
+    for esemeny, _ in esemenyek_olvasasa(naplo_utvonal):
+        if esemeny.get("e") != "jatek_vege" or esemeny.get("jatekosnev") is None:
+            continue
+        koteg.append(
+            (
+                esemeny["jatekosnev"],
+                esemeny["ossz_ido"],
+                esemeny["ossz_tipp"],
+                esemeny.get("start_time"),
+                esemeny.get("mikor_jatszott"),
+            )
+        )
+        if len(koteg) >= koteg_meret:
+            osszes += ranglista.tobb_hozzaadasa(koteg)
+            koteg = []
+    if koteg:
+        osszes += ranglista.tobb_hozzaadasa(koteg)
+    return osszes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    alparancsok = parser.add_subparsers(dest="parancs", required=True)
+
+    statisztika_parancs = alparancsok.add_parser("statisztika", help="összesítés a naplóból")
+    statisztika_parancs.add_argument("naplo", nargs="?", default=ESEMENYNAPLO)
+    statisztika_parancs.add_argument(
+        "--allapot", help="ide menti az állapotot, és innen folytatja legközelebb"
+    )
+    statisztika_parancs.add_argument("-n", type=int, default=10)
+
+    ranglista_parancs = alparancsok.add_parser("ranglista", help="ranglista újraépítése")
+    ranglista_parancs.add_argument("naplo")
+    ranglista_parancs.add_argument("adatbazis")
+
+    args = parser.parse_args()
+    if args.parancs == "statisztika":
+        statisztika = Statisztika.betoltes(args.allapot) if args.allapot else Statisztika()
+        statisztika.fajl_feldolgozasa(args.naplo)
+        if args.allapot:
+            statisztika.mentes(args.allapot)
+        print(json.dumps(statisztika.osszefoglalo(args.n), ensure_ascii=False, indent=2))
+    else:
+        print(f"{ranglista_ujraepitese(args.naplo, args.adatbazis)} eredmény beszúrva.")
+
+
+if __name__ == "__main__":
+    main()
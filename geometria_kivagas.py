@@ -0,0 +1,156 @@
+"""A háttértérkép csomagolt geometriájának (balaton_geometria.npz) előállítása.
+
+A cartopy a Natural Earth rétegeket az első rajzoláskor tölti le az internetről, ami lassú
+(és hálózat nélkül el sem indul a térkép). Ehelyett a Balaton környékére előre kivágott
+geometriát szállítjuk a csomaggal, és az alapterkep.py ebből rajzol, cartopy nélkül.
+
+Forrás: a GSHHG (GSHHS partvonalak és tavak, illetve WDBII országhatárok) adatai a
+basemap-data és basemap-data-hires csomagokból (LGPL-3.0-or-later), mert a Natural Earth
+letöltési oldala nem mindenhonnan érhető el, a PyPI viszont igen. A kivágáshoz shapely kell.
+A kivágott adat licence is LGPL-3.0-or-later: a forrásmegjelölés és a licencszöveg a fájl
+mellett van (balaton_geometria.NOTICE.txt, balaton_geometria.COPYING*.txt).
+Csak akkor kell újra futtatni, ha a kivágás területét vagy a felbontást módosítani akarjuk:
+
+    pip install basemap-data basemap-data-hires shapely
+    python geometria_kivagas.py
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from alapterkep import GEOMETRIA_FAJL
+
+# (min_lon, max_lon, min_lat, max_lat): bőven a játék kiterjedése körül, hogy a helységnévtárhoz
+# igazított (terbeli_index.kiterjedes) térkép is beleférjen
+KIVAGAS = (16.0, 19.5, 45.7, 47.9)
+FELBONTAS = "f"  # c, l, i, h, f (durvától a teljesig); a h és f a basemap-data-hires csomagban van
+
+# GSHHS szintek: 1 = szárazföld, 2 = tó
+SZARAZFOLD, TO = 1, 2
+
+
+def _reszek(mappa, nev, felbontas):
+    """A basemap_data bináris fájljainak olvasása: (szint, (n, 2) lon/lat tömb) párok.
+    A meta fájl soronként: szint, terület, pontszám, déli és északi határ, eltolás, bájtszám."""
+
+    with open(os.path.join(mappa, f"{nev}_{felbontas}.dat"), "rb") as f:
+        adat = f.read()
+    with open(os.path.join(mappa, f"{nev}meta_{felbontas}.dat"), encoding="ascii") as f:
+        for sor in f:
+            mezok = sor.split()
+            pontszam, eltolas, bajtszam = int(mezok[2]), int(mezok[5]), int(mezok[6])
+            pontok = np.frombuffer(adat[eltolas : eltolas + bajtszam], dtype="<f4")
+            yield int(mezok[0]), pontok.reshape(pontszam, 2).astype(np.float64)
+
+
+def _geometriak(alakzat):
+    """Egy shapely eredmény (lehet Multi... vagy GeometryCollection) egyszerű részei."""
+
+    if alakzat.is_empty:
+        return []
+    if hasattr(alakzat, "geoms"):
+        return [resz for g in alakzat.geoms for resz in _geometriak(g)]
+    return [alakzat]
+
+
+def _kivagott_sokszogek(reszek, szint, keret):
+    from shapely.geometry import Polygon
+
+    sokszogek = []
+    for resz_szint, pontok in reszek:
+        if resz_szint != szint:
+            continue
+        sokszog = Polygon(pontok).buffer(0)  # az önmetsző gyűrűket is kijavítja
+        for darab in _geometriak(sokszog.intersection(keret)):
+            if darab.geom_type == "Polygon":
+                sokszogek.append(np.asarray(darab.exterior.coords))
+    return sokszogek
+
+
+def _kivagott_vonalak(reszek, keret):
+    from shapely.geometry import LineString
+
+    vonalak = []
+    for _, pontok in reszek:
+        for darab in _geometriak(LineString(pontok).intersection(keret)):
+            if darab.geom_type == "LineString":
+                vonalak.append(np.asarray(darab.coords))
+    return vonalak
+
+
+def _osszefuzes(reteg):
+    """Egy réteg alakzatai egyetlen float32 koordinátatömbben, plusz a kezdőindexek."""
+
+    hatarok = np.cumsum([0] + [len(pontok) for pontok in reteg])
+    koordinatak = np.vstack(reteg) if reteg else np.empty((0, 2))
+    return koordinatak.astype(np.float32), hatarok.astype(np.int64)
+
+
+def kivagas(mappak, kivagas_terulet=KIVAGAS, felbontas=FELBONTAS):
+    """A rétegek (szarazfold, to, partvonal, hatar) kivágása: név --> alakzatok listája."""
+
+    from shapely.geometry import box
+
+    min_lon, max_lon, min_lat, max_lat = kivagas_terulet
+    keret = box(min_lon, min_lat, max_lon, max_lat)
+
+    def keres(nev):
+        for mappa in mappak:
+            if os.path.isfile(os.path.join(mappa, f"{nev}_{felbontas}.dat")):
+                return list(_reszek(mappa, nev, felbontas))
+        raise FileNotFoundError(f"{nev}_{felbontas}.dat nem található: {', '.join(mappak)}")
+
+    partok = keres("gshhs")
+    return {
+        "szarazfold": _kivagott_sokszogek(partok, SZARAZFOLD, keret),
+        "to": _kivagott_sokszogek(partok, TO, keret),
+        # a partvonal a szárazföld és a tengerek határa: a kivágás szélén nem húzunk vonalat
+        "partvonal": _kivagott_vonalak(
+            [(szint, pontok) for szint, pontok in partok if szint == SZARAZFOLD], keret
+        ),
+        "hatar": _kivagott_vonalak(keres("countries"), keret),
+    }
+
+
+def mentes(retegek, utvonal=GEOMETRIA_FAJL, kivagas_terulet=KIVAGAS, felbontas=FELBONTAS):
+    tombok = {"kivagas": np.array(kivagas_terulet), "felbontas": np.array(felbontas)}
+    for nev, reteg in retegek.items():
+        tombok[nev], tombok[f"{nev}_hatarok"] = _osszefuzes(reteg)
+    ideiglenes = f"{utvonal}.{os.getpid()}.tmp"
+    with open(ideiglenes, "wb") as f:
+        np.savez_compressed(f, **tombok)
+    os.replace(ideiglenes, utvonal)
+
+
+def _alap_mappak():
+    # a basemap-data és a basemap-data-hires ugyanabba a (névtér)csomagba telepít
+    try:
+        from mpl_toolkits import basemap_data
+    except ImportError:
+        return []
+    return list(basemap_data.__path__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A csomagolt háttértérkép geometria kivágása.")
+    parser.add_argument(
+        "--mappa",
+        action="append",
+        help="basemap_data mappa (alapból a telepített basemap-data csomag(ok) mappái)",
+    )
+    parser.add_argument("--felbontas", default=FELBONTAS, choices=list("clihf"))
+    parser.add_argument("--kimenet", default=GEOMETRIA_FAJL)
+    args = parser.parse_args()
+
+    mappak = args.mappa or _alap_mappak()
+    retegek = kivagas(mappak, felbontas=args.felbontas)
+    mentes(retegek, args.kimenet, felbontas=args.felbontas)
+    for nev, reteg in retegek.items():
+        print(f"{nev}: {len(reteg)} alakzat, {sum(len(p) for p in reteg)} pont")
+    print(f"kiírva: {args.kimenet} ({os.path.getsize(args.kimenet)} bájt)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""A játékban szereplő települések helységnévtára.
+
+Betöltéskor egyszer felépíti a településnév --> sorszám indexet, és előre kiszámolja minden
+településpár között a távolságot, illetve az észak-déli és kelet-nyugati eltérést km-ben.
+Így egy tipp kiértékelése csak néhány tömbelem kiolvasása, nincs szükség pandas szűrésre.
+
+A helységnévtár folyamatonként egyetlen, csak olvasható példány (helysegnevtar_betoltese), amit
+az összes streamlit munkamenet közösen használ: a nevek egy tuple-ben, a koordináták és a mátrixok
+írásvédett numpy tömbökben vannak. A munkamenetek csak egész sorszámokat tárolnak (a gép
+gondolata és a tippelt városok, lásd jatekmotor.GameSession), a nevek és koordináták ebből
+bármikor visszakereshetők (pl. a térképhez: helyek()).
+
+A koordináták float64-ek maradnak: float32-re kerekítve a 43 település 1806 párjából 16-nál
+megváltozna a 2 tizedesre kerekített km, a memóriában pedig településenként 8 bájt a különbség.
+
+Nagy helységnévtárnál (MATRIX_KORLAT felett) a teljes NxN mátrix már túl sok memória lenne,
+ilyenkor a gép gondolatához tartozó sort számoljuk ki egyetlen vektorizált hívással
+(tavolsag.egy_a_tobbhoz), és az utoljára használt sorokat gyorsítótárban tartjuk.
+"""
+
+import hashlib
+import random
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+import numpy as np
+
+import tavolsag
+
+# e fölött a településszám fölött nem számolunk teljes mátrixot (3 db float64 NxN tömb)
+MATRIX_KORLAT = 2000
+SOR_CACHE_MERET = 256
+
+
+class Helysegnevtar:
+    """Településnevek, koordináták és az előre kiszámolt NxN távolság mátrixok.
+
+    A motor a tavolsag.MOTOROK egyike (alapértelmezés: a pontos "geodesic").
+    """
+
+    def __init__(self, varosok, latitude, longitude, motor="geodesic"):
+        self.varosok = tuple(varosok)
+        self.index = MappingProxyType({varos: i for i, varos in enumerate(self.varosok)})
+        self.latitude = _irasvedett(np.array(latitude, dtype=np.float64))
+        self.longitude = _irasvedett(np.array(longitude, dtype=np.float64))
+        self.motor = motor
+        tavolsag.motor(motor)  # ismeretlen motornév esetén már itt hibát dob
+
+        # a tartalomból számolt változat azonosító (pl. a rendezett legördülő lista gyorsítótárához)
+        ujjlenyomat = hashlib.sha256("\n".join(self.varosok).encode("utf-8"))
+        ujjlenyomat.update(self.latitude.tobytes())
+        ujjlenyomat.update(self.longitude.tobytes())
+        self.verzio = ujjlenyomat.hexdigest()[:16]
+
+        self._sor_cache = OrderedDict()
+        self._sor_zar = threading.Lock()
+        self._terbeli_index = None
+
+        # [gép gondolata, tipp] sorrendben tárolva, ahogy a jatek() használja
+        self.tavolsag_km = self.eszakdel_km = self.keletnyugat_km = None
+        if len(self.varosok) <= MATRIX_KORLAT:
+            sorok = [self._sor_szamolasa(i) for i in range(len(self.varosok))]
+            self.tavolsag_km, self.eszakdel_km, self.keletnyugat_km = (
+                _irasvedett(np.vstack(matrix_sorai)) for matrix_sorai in zip(*sorok)
+            )
+
+    @classmethod
+    def tablazatbol(cls, coordinates, motor="geodesic"):
+        """A betoltes.koordinatak_betoltese() által visszaadott táblázatból, vagy a
+        betoltes.koordinata_oszlopok() (nevek, latitude, longitude) hármasából építi fel."""
+
+        if isinstance(coordinates, tuple):
+            return cls(*coordinates, motor=motor)
+        return cls(
+            coordinates["Város"].tolist(),
+            coordinates["latitude"].to_numpy(),
+            coordinates["longitude"].to_numpy(),
+            motor=motor,
+        )
+
+    def _sor_szamolasa(self, gep):
+        return tavolsag.egy_a_tobbhoz(
+            self.latitude[gep],
+            self.longitude[gep],
+            self.latitude,
+            self.longitude,
+            motor_nev=self.motor,
+        )
+
+    def sor(self, gep):
+        """(távolság, észak-dél, kelet-nyugat eltérés) km-ben a gep sorszámú településtől
+        az összes többihez, sorszám szerint indexelhető tömbökként."""
+
+        if self.tavolsag_km is not None:
+            return self.tavolsag_km[gep], self.eszakdel_km[gep], self.keletnyugat_km[gep]
+
+        with self._sor_zar:
+            if gep in self._sor_cache:
+                self._sor_cache.move_to_end(gep)
+                return self._sor_cache[gep]
+
+        sor = tuple(_irasvedett(np.asarray(tomb)) for tomb in self._sor_szamolasa(gep))
+
+        with self._sor_zar:
+            self._sor_cache[gep] = sor
+            if len(self._sor_cache) > SOR_CACHE_MERET:
+                self._sor_cache.popitem(last=False)
+        return sor
+
+    @property
+    def terbeli_index(self):
+        """A településeken épített térbeli index (terbeli_index.py), első használatkor épül fel."""
+
+        if self._terbeli_index is None:
+            from terbeli_index import TerbeliIndex
+
+            with self._sor_zar:
+                if self._terbeli_index is None:
+                    self._terbeli_index = TerbeliIndex(self)
+        return self._terbeli_index
+
+    def __len__(self):
+        return len(self.varosok)
+
+    def __contains__(self, varos):
+        return varos in self.index
+
+    def koordinatak(self, varos):
+        """Egy település (latitude, longitude) párja."""
+
+        i = self.index[varos]
+        return float(self.latitude[i]), float(self.longitude[i])
+
+    def helyek(self, sorszamok):
+        """A megadott sorszámú települések (név, latitude, longitude) hármasai név szerint
+        rendezve, ismétlés nélkül (a térkép gyorsítótárának kulcsa, lásd alapterkep.terkep_png)."""
+
+        return tuple(
+            sorted(
+                (self.varosok[i], float(self.latitude[i]), float(self.longitude[i]))
+                for i in set(sorszamok)
+            )
+        )
+
+    def veletlen_varos(self):
+        """A gép "gondolata": egy véletlenszerűen választott település neve."""
+
+        return self.varosok[random.randrange(len(self.varosok))]
+
+
+def _irasvedett(tomb):
+    tomb.setflags(write=False)
+    return tomb
+
+
+_memo = {}
+_memo_zar = threading.Lock()
+
+
+def helysegnevtar_betoltese(coordinates, motor="geodesic"):
+    """Táblázatonként egyszer építi fel a helységnévtárat (a betöltő ugyanazt a DataFrame-et,
+    illetve oszlop hármast adja vissza, amíg a fájl nem változik, így az id() alapján gyorsítótárazunk)."""
+
+    kulcs = (id(coordinates), motor)
+    with _memo_zar:
+        talalat = _memo.get(kulcs)
+        if talalat is not None and talalat[0] is coordinates:
+            return talalat[1]
+
+    nevtar = Helysegnevtar.tablazatbol(coordinates, motor=motor)
+
+    with _memo_zar:
+        _memo.clear()
+        _memo[kulcs] = (coordinates, nevtar)
+    return nevtar
@@ -1,94 +1,86 @@
-import pandas as pd
 import os
-import math
-import time
 import streamlit as st
-import csv
-from datetime import datetime
-import matplotlib.pyplot as plt
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 # import mpu
-from io import BytesIO
-import requests
-import locale
-import geopy.distance
-
-# az alapjátékhoz szükséges függvény 
-def jatek(tipp, coordinates, gepgondolata):
-    """Inputként megkapja a játékos által tippelt várost,
-    ha nem egyezik meg a gép gondolatával, akkor visszaadja, hogy milyen irányba és milyen távolságra található tőle.
-    Ha megegyezik a gép gondolata a tippelt várossal, akkor egy space-t (" ") ad visszatérési értékként, amivel vége a játéknak/adott körnek.
+from betoltes import koordinata_oszlopok, hatter_frissites_inditasa
+from helysegnevtar import helysegnevtar_betoltese
+from bemelegites import hatter_bemelegites_inditasa
+from alapterkep import terkep_png
+from elo_terkep import alapterkep_fajl, terkep_svg
+from jatekmotor import KOMPETITIV_KOROK, GameSession
+from ranglista import ADATBAZIS
+from terbeli_index import NEHEZSEGI_SZINTEK
+from megoldo import menet_megoldoja
+from esemenynaplo import megosztott_esemenynaplo
+from rendezes import rendezett_opciok
+from ranglista_index import megosztott_ranglista
+import metrikak
+from metrikak import meres
+
+# "elo": minden tipp után frissülő SVG térkép a böngészőben gyorsítótárazott háttérképen (elo_terkep.py),
+# "cartopy": a korábbi, szerveren rajzolt PNG csak a kör végén
+TERKEP_MOD = os.environ.get("BALATON_TERKEP", "elo")
+
+
+def elo_terkep_mod(nevtar):
+    """Az élő térképhez a streamlit statikus fájlkiszolgálása kell (.streamlit/config.toml), és az,
+    hogy a háttérkép kiírható legyen a static/ mappába (írásvédett telepítésnél nem az)."""
+
+    return (
+        TERKEP_MOD == "elo"
+        and bool(st.get_option("server.enableStaticServing"))
+        and alapterkep_fajl(nevtar.terbeli_index.kiterjedes()) is not None
+    )
+
+
+# Ez kell ahhoz, hogy miután valaki kitalált a gép gondolatát, ábrázolni lehessen a tippjeit egy Balcsi térképen
+def terkep(nevtar, tippelt_sorszamok):
+    """A tipp leadásakor eltárolásra kerülnek a tippelt városok (a játékmenetben, sorszámként).
+    A függvény ezeket a városokat felrakja a Balaton köré egy ponttal és a nevüket kiírva.
+    A nevek és koordináták a közös helységnévtárból, a sorszámok alapján kerülnek elő.
     """
 
-    if gepgondolata == tipp:
-        return "    "
-    elif tipp not in coordinates["Város"].values:
-        return "Sajnos a tippelt város nem szerepel az adatbázisomban. Ügyelj arra, hogy a településnevet nagybetűvel kezdve, ékezettel írd le!"
-        # teszteléseim alapján nincs erre szükség, mert legördülő listából nem is enged mást választani, de a streamlit tud annyira szeszélyes lenni, hogy inkább bennehagyom
-        # (azt feltételezve, hogy mégis lehet valahogyan nem értelmes inputot leadni tippként), nehogy ennek hiánya okozzon gondot a futásnál
-    else:
-        gep_lat = coordinates.loc[
-            coordinates["Város"] == gepgondolata, "latitude"
-        ].values[0]
-        gep_long = coordinates.loc[
-            coordinates["Város"] == gepgondolata, "longitude"
-        ].values[0]
-        tipp_lat = coordinates.loc[coordinates["Város"] == tipp, "latitude"].values[0]
-        tipp_long = coordinates.loc[coordinates["Város"] == tipp, "longitude"].values[0]
-
-        lat_km = 111.574
-        long_km = 111.320 * math.cos(math.radians((gep_lat + tipp_lat) / 2))
-
-        dif_lat = abs(gep_lat - tipp_lat) * lat_km
-        dif_long = abs(gep_long - tipp_long) * long_km
-
-        # distance = mpu.haversine_distance((gep_lat, gep_long), (tipp_lat, tipp_long))
-        gep_koordinatak = (gep_lat, gep_long)
-        tipp_koordinatak = (tipp_lat, tipp_long)
-        distance = geopy.distance.geodesic(gep_koordinatak, tipp_koordinatak).km        
-        
-        # kicsit necces, hogy a pontos távolság Haversine formulával van számolva, viszont az, hogy mennyire van délre/északra/keletre/nyugatra dolgok meg laposföldhöz van viszonyítva
-
-        eszakdel = "" if dif_lat < 3 else ("észak" if gep_lat > tipp_lat else "dél")
-        nyugatkelet = (
-            "" if dif_long < 3 else ("kelet" if gep_long > tipp_long else "nyugat")
+    # a térkép kiterjedése a helységnévtár településeihez igazodik (terbeli_index.py)
+    kiterjedes = nevtar.terbeli_index.kiterjedes()
+
+    if elo_terkep_mod(nevtar):
+        # a háttérkép egy statikus fájl, tippenként csak a pontokat tartalmazó SVG készül el
+        sorrendben = tuple(
+            (nevtar.varosok[i], float(nevtar.latitude[i]), float(nevtar.longitude[i]))
+            for i in dict.fromkeys(tippelt_sorszamok)
         )
-        # ha az észak/dél/nyugat/kelet távolság kisebb, mint 3km, akkor azt nem írja ki (így pl. csak annyit ír, hogy "4,6km-re nyugatra")
+        with meres("terkep"):
+            svg = terkep_svg(sorrendben, kiterjedes)
+        st.markdown(svg, unsafe_allow_html=True)
+        return
 
-        if dif_lat < 3 and dif_long < 3:
-            return f"A gép által kigondolt város {tipp} településhez viszonyítva {round(distance, 2)} km-re található."
-        # ha az észak/dél és nyugat/kelet is 3km-en belül van, akkor egyiket se írja ki, csak a konkrét távolságot
+    # a háttértérkép folyamatonként egyszer készül el, a kész képek pedig a tippelt városok
+    # halmaza szerint vannak gyorsítótárazva (alapterkep.py)
+    tippek = nevtar.helyek(tippelt_sorszamok)
+    with meres("terkep"):
+        kep = terkep_png(tippek, kiterjedes)
+    st.image(kep)
 
-        return f"A gép által kigondolt város {tipp} településhez viszonyítva {round(distance, 2)} km-re {eszakdel}{nyugatkelet} irányba található."
 
+# ennél több település esetén a legördülő lista fölött egy keresőmező is megjelenik
+KERESO_KUSZOB = 200
 
-# Ez kell ahhoz, hogy miután valaki kitalált a gép gondolatát, ábrázolni lehessen a tippjeit egy Balcsi térképen
-def terkep():
-    """Egy dictionaryben eltárolásra kerül a tipp leadásakor a város neve és koordinátái.
-    A függvény ezeket a városokat felrakja a Balaton köré egy ponttal és a nevüket kiírva.
-    """
 
-    # innentől ameddig jelezve van (kb. 65. sor) a terkep része chat gpt-nek köszönhető teljesen
-    extent = [17.18, 18.4, 46.66, 47.1]  # [min_lon, max_lon, min_lat, max_lat]
-    fig, ax = plt.subplots(
-        figsize=(8, 8), subplot_kw={"projection": ccrs.PlateCarree()}
-    )
-    ax.set_extent(extent)
-    ax.add_feature(cfeature.BORDERS, linestyle=":")
-    ax.add_feature(cfeature.COASTLINE)
-    ax.add_feature(cfeature.LAND, edgecolor="black")
-    ax.add_feature(cfeature.LAKES, color="blue")
-    # idáig --> magamtól sablont nem találtam, nem tudtam megcsinálni és nem jöttem rá hogyan lehet így leszedni, hogy azzal tudjak tovább dolgozni (tehát lehessen longitude és latitude által pluszban pontokat elhelyezni a térképen és látszódjon hol van a Balaton)
+def tipp_valasztas(nevtar):
+    """A tipp kiválasztására szolgáló legördülő lista, magyar ábécérendben.
+    A locale.setlocale(locale.LC_COLLATE, "hu_HU.UTF-8") az egész folyamatra hat és a streamlit ezt nem szereti,
+    ezért a rendezést a rendezes.py végzi, helységnévtár-változatonként egyszer."""
+
+    with meres("rendezes"):
+        opciok, elotag_index = rendezett_opciok(nevtar)
 
-    for város, koordináták in st.session_state.tippelt_varos_dict.items():
-        longitude = koordináták["longitude"]
-        latitude = koordináták["latitude"]
-        ax.scatter(longitude, latitude, color="red", s=50, zorder=10)
-        ax.text(longitude + 0.015, latitude - 0.02, város, fontsize=8)
+    if len(opciok) > KERESO_KUSZOB:
+        elotag = st.text_input("Szűkítsd a listát a település első betűivel:")
+        opciok = elotag_index.szukites(elotag)
 
-    plt.title("Így jutottál el a célig :))", fontsize=10)
-    st.pyplot(fig)
+    return st.selectbox(
+        label="Válaszd ki a tipped a legördülő listából!",
+        options=opciok,
+    )
 
 
 # Játék típusának kiválasztása (egyszerű vagy kompetitív)
@@ -101,10 +93,17 @@ def jatek_tipus_valasztas():
         st.session_state.típus = None
 
     if st.session_state.típus is None:
+        # a nehézség csak az egyszerű játékra vonatkozik, hogy a ranglista eredményei összevethetők maradjanak
+        nehezseg = st.radio(
+            "Nehézség (egyszerű játékban):",
+            ["vegyes", *NEHEZSEGI_SZINTEK],
+            horizontal=True,
+        )
         col1, col2 = st.columns(2)
 
         if col1.button("Egyszerű játék"):
             st.session_state.típus = "egyszerű"
+            st.session_state.nehezseg = None if nehezseg == "vegyes" else nehezseg
             st.session_state.jatekvalasztofelirat_allapot = False
 
         if col2.button("Kompetitív játék"):
@@ -115,100 +114,80 @@ def jatek_tipus_valasztas():
 # új játék indítása függvény --> nem tökéletesen jelenik meg és általában kétszer kell kattintani, de nem tudom hogyan lehetne kijavítani
 def új_játék_indítása():
     """Új játék indításához a session state-ben tárolt dolgokat kitörli"""
-    
+
+    # a félbehagyott játék is bekerül az eseménynaplóba
+    if "jatekmenet" in st.session_state:
+        st.session_state.jatekmenet.feladas()
     st.session_state.clear()
     jatek_tipus_valasztas()
 
 
-def ranglistahoz(
-    Játékosnév, total_time, total_tipp_szam, start_time, pontos_start_time
-):
-    """Kompetitív játék esetében miután három egymás utáni körben is kitalálta a "gondolt" balatoni települést, bekerül az eredménye a ranglistába (csv fájlba)."""
+def ranglista_meghivasa(file_neve=ADATBAZIS):
+    """A ranglista meghívását segítő függvény. Az összes munkamenet közös, memóriában tartott rangsor-indexét adja vissza
+    (ranglista_index.py), ami az első híváskor az adatbázisból épül fel (a régi ranglista6.csv-t is beimportálva)."""
 
-    fajl_nev = "ranglista6.csv"
+    ranglista = megosztott_ranglista(file_neve)
+    metrikak.beallit("ranglista_meret", len(ranglista))
+    return ranglista
 
-    letezik = os.path.isfile(fajl_nev)
-
-    with open(fajl_nev, mode="a", newline="", encoding="utf-8") as csvfile:
-        csvwriter = csv.writer(csvfile)
-
-        if not letezik:
-            csvwriter.writerow(
-                [
-                    "Játékosnév",
-                    "Össz. idő (mp)",
-                    "Össz. tipp szám",
-                    "start_time",
-                    "Mikor játszott",
-                ]
-            )  # első sor --> változók nevei
-
-        csvwriter.writerow(
-            [Játékosnév, total_time, total_tipp_szam, start_time, pontos_start_time]
-        )
 
+def egyszeru_jatek(nevtar):
+    """Az egyszerű játékhoz szükséges függvény. Miután a játékos eltalálta, hogy melyik településre gondolt a gép, kiírja, hogy mennyi időre és hány tippre volt szüksége a játékosnak ehhez.
+    Továbbá meghívja a Balaton térképet, amelyen ábrázolva vannak a tippelt városok elhelyezkedése.
+    A játék állapotát a jatekmotor.GameSession tartja, ez a függvény csak a felületet adja hozzá.
+    """
 
-def ranglista_meghivasa(file_neve):
-    """A ranglistaként eltárolt csv fájl meghívását segítő függvény."""
+    if st.session_state.típus == "egyszerű":
+        if "jatekmenet" not in st.session_state:
+            st.session_state.jatekmenet = GameSession(
+                nevtar,
+                nehezseg=st.session_state.get("nehezseg"),
+                naplo=megosztott_esemenynaplo(),
+            )
+        menet = st.session_state.jatekmenet
 
-    return pd.read_csv(file_neve)
+        tipp = tipp_valasztas(nevtar)
 
+        if st.button("Segítség") and not menet.vege:
+            segitseg = menet.segitseg()
+            if segitseg is not None:
+                st.info(
+                    f"A még nem tippelt települések közül {segitseg[0]} van a legközelebb a gép gondolatához ({round(segitseg[1], 2)} km-re)."
+                )
 
-def egyszeru_jatek(coordinates):
-    """Az egyszerű játékhoz szükséges függvény. Miután a játékos eltalálta, hogy melyik településre gondolt a gép, kiírja, hogy mennyi időre és hány tippre volt szüksége a játékosnak ehhez.
-    Továbbá meghívja a Balaton térképet, amelyen ábrázolva vannak a tippelt városok elhelyezkedése.
-    """
+        if st.button("Mit tippeljek?") and not menet.vege:
+            # a megoldó az eddigi válaszok alapján szűkíti a lehetséges településeket (megoldo.py)
+            megoldo = menet_megoldoja(menet)
+            javaslat, _ = megoldo.legjobb_tipp()
+            st.info(
+                f"Az eddigi válaszok alapján még {len(megoldo)} település jöhet szóba. Érdemes lehet ezt tippelni: {nevtar.varosok[javaslat]}"
+            )
 
-    if "tippelt_varos_dict" not in st.session_state:
-        st.session_state.tippelt_varos_dict = {}
+        if st.button("Küldés") and tipp and not menet.vege:
+            with meres("jatek"):
+                eredmeny = menet.tipp(tipp)
+            metrikak.novel("tippek", mod="egyszeru")
+            st.write(eredmeny.uzenet)
 
-    if st.session_state.típus == "egyszerű":
-        if "gepgondolata" not in st.session_state:
-            st.session_state.gepgondolata = coordinates.sample(1).iloc[0]["Város"]
-            st.session_state.tipp_szam = 0
-            st.session_state.start_time = time.time()
-
-        # locale.setlocale(locale.LC_COLLATE, "hu_HU.UTF-8")
-        # streamlit ezt nem szereti
-        
-        # helyette applikációhoz:
-        locale.setlocale(locale.LC_COLLATE, "")
-        tipp = st.selectbox(
-            label="Válaszd ki a tipped a legördülő listából!",
-            options=sorted(coordinates["Város"].tolist(), key=locale.strxfrm),
-        )
+            if not eredmeny.talalt and elo_terkep_mod(nevtar):
+                terkep(nevtar, menet.kor_tippjei)
 
-        if st.button("Küldés") and tipp:
-
-            # a tippelt_varos_dict a balcsis ábrázoláshoz kell:
-            index = coordinates[coordinates["Város"] == tipp].iloc[0]
-            latitude = index["latitude"]
-            longitude = index["longitude"]
-            st.session_state.tippelt_varos_dict[tipp] = {
-                "latitude": latitude,
-                "longitude": longitude,
-            }
-
-            st.session_state.tipp_szam += 1
-            eredmeny = jatek(tipp, coordinates, st.session_state.gepgondolata)
-            st.write(eredmeny)
-
-            if eredmeny == "    ":
-                eltelt_ido = time.time() - st.session_state.start_time
-                perc = int(eltelt_ido // 60)
-                masodperc = int(eltelt_ido % 60)
+            if eredmeny.talalt:
+                metrikak.novel("befejezett_jatekok", mod="egyszeru")
+                perc = int(eredmeny.kor_ido // 60)
+                masodperc = int(eredmeny.kor_ido % 60)
                 st.success(
-                    f"Gratulálok, nyertél! Ehhez {st.session_state.tipp_szam} tippre és {perc} perc {masodperc} mp-re volt szükséged! :))"
+                    f"Gratulálok, nyertél! Ehhez {eredmeny.kor_tipp_szam} tippre és {perc} perc {masodperc} mp-re volt szükséged! :))"
                 )
                 st.balloons()
-                terkep()
+                terkep(nevtar, menet.kor_tippjei)
 
     if st.button("Új játék indítása (2x kattintsd)"):
         új_játék_indítása()
         # ezek a gombok nem működnek tökéletesen, általában kétszer kell kattintani, nem tudom, hogyan lehetne javítani
 
 
-def kompetitiv_jatek(coordinates):
+def kompetitiv_jatek(nevtar):
     """A kompetitív játékmódhoz szükséges függvény.
     A játék az egyszerű játékhoz hasonlóan van lejátszva, egymás után háromszor. A gép minden kör elején gondol egy településre, amelyet ki kell találnia a játékosnak.
     Miután egy adott körben kitalálja a játékos a gondolt települést, a gép visszaadja, hogy ehhez mennyi időre és hány tippre volt szükség, illetve meghívja a tippjeit elhelyező térképet.
@@ -218,25 +197,10 @@ def kompetitiv_jatek(coordinates):
 
     if st.session_state.típus == "kompetitív":
 
-        # innentől
-        if "kovetkezo_kor" not in st.session_state:
-            st.session_state.kovetkezo_kor = False
         if "Játékosnév" not in st.session_state:
             st.session_state.Játékosnév = None
         if "jatek_indul" not in st.session_state:
             st.session_state.jatek_indul = False
-        if "kompetitív_round" not in st.session_state:
-            st.session_state.kompetitív_round = 1
-        if "total_tipp_szam" not in st.session_state:
-            st.session_state.total_tipp_szam = 0
-        if "total_time" not in st.session_state:
-            st.session_state.total_time = 0
-        if "round_tipp_szam" not in st.session_state:
-            st.session_state.round_tipp_szam = 0
-        if "start_time" not in st.session_state:
-            st.session_state.start_time = time.time()
-        if "tippelt_varos_dict" not in st.session_state:
-            st.session_state.tippelt_varos_dict = {}
 
         if not st.session_state.jatek_indul:
             st.session_state.Játékosnév = st.text_input("Add meg a játékosneved:")
@@ -250,121 +214,64 @@ def kompetitiv_jatek(coordinates):
                         f"Sok sikert, {st.session_state.Játékosnév}! Kezdődik a játék!"
                     )
                     st.session_state.jatek_indul = True
+                    # a játék végén a motor maga teszi be az eredményt a ranglistába
+                    st.session_state.jatekmenet = GameSession(
+                        nevtar,
+                        korok_szama=KOMPETITIV_KOROK,
+                        jatekosnev=st.session_state.Játékosnév,
+                        ranglista=ranglista_meghivasa(),
+                        naplo=megosztott_esemenynaplo(),
+                    )
 
         if st.session_state.jatek_indul == True:
+            menet = st.session_state.jatekmenet
 
             # ez a rész biztosítja a 2. és 3. kört
-            if st.session_state.kovetkezo_kor == True:
-
-                st.session_state.kompetitív_round += 1
-                st.session_state.gepgondolata = coordinates.sample(1).iloc[0]["Város"]
-                st.session_state.round_tipp_szam = 0
-                st.session_state.round_start_time = time.time()
-                st.session_state.kovetkezo_kor = False
-
-            # ez az első körhöz kell a kompetitív játékban
-            if "gepgondolata" not in st.session_state:
-                st.session_state.gepgondolata = coordinates.sample(1).iloc[0]["Város"]
-                st.session_state.round_tipp_szam = 0
-                st.session_state.round_start_time = time.time()
-
-            
-            # locale.setlocale(locale.LC_COLLATE, "hu_HU.UTF-8")
-            # streamlit ezt nem szereti
-        
-            # helyette applikációhoz:
-            locale.setlocale(locale.LC_COLLATE, "")
-            tipp = st.selectbox(
-                label="Válaszd ki a tipped a legördülő listából!",
-                options=sorted(coordinates["Város"].tolist(), key=locale.strxfrm),
-            )
+            if menet.kor_lezarva and not menet.vege:
+                menet.kovetkezo_kor()
 
-            if st.button("Küldés") and tipp:
+            tipp = tipp_valasztas(nevtar)
 
-                # a tippelt_varos_dict a balcsis ábrázoláshoz kell:
-                index = coordinates[coordinates["Város"] == tipp].iloc[0]
-                latitude = index["latitude"]
-                longitude = index["longitude"]
-                st.session_state.tippelt_varos_dict[tipp] = {
-                    "latitude": latitude,
-                    "longitude": longitude,
-                }
+            if st.button("Küldés") and tipp and not menet.vege:
+                with meres("jatek"):
+                    eredmeny = menet.tipp(tipp)
+                metrikak.novel("tippek", mod="kompetitiv")
+                st.write(eredmeny.uzenet)
 
-                st.session_state.round_tipp_szam += 1
-                eredmeny = jatek(tipp, coordinates, st.session_state.gepgondolata)
-                st.write(eredmeny)
+                if not eredmeny.talalt and elo_terkep_mod(nevtar):
+                    terkep(nevtar, menet.kor_tippjei)
 
-                if eredmeny == "    ":
-                    round_time = time.time() - st.session_state.round_start_time
-                    st.session_state.total_tipp_szam += st.session_state.round_tipp_szam
-                    st.session_state.total_time += round_time
-                    perc = int(round_time // 60)
-                    masodperc = int(round_time % 60)
+                if eredmeny.talalt:
+                    perc = int(eredmeny.kor_ido // 60)
+                    masodperc = int(eredmeny.kor_ido % 60)
 
                     st.write(
-                        f"Gratulálok, {st.session_state.Játékosnév}! A(z) {st.session_state.kompetitív_round}. kör sikeres volt! {st.session_state.round_tipp_szam} tippre és {perc} perc {masodperc} másodpercre volt szükséged."
+                        f"Gratulálok, {st.session_state.Játékosnév}! A(z) {eredmeny.kor}. kör sikeres volt! {eredmeny.kor_tipp_szam} tippre és {perc} perc {masodperc} másodpercre volt szükséged."
                     )
 
-                    terkep()
-                    st.session_state.tippelt_varos_dict = {}
-                    # itt ezt ki kell "üríteni", hogy az új "kör"-nél csak az új tipphez tartozó városok legyenek eltárolva a dictionaryben és ábrázolva a térképen
+                    terkep(nevtar, menet.kor_tippjei)
+                    # az új körnél a motor üríti a tippelt városokat, így a térképen mindig csak az adott kör tippjei vannak
 
-                    if st.session_state.kompetitív_round < 3:
-                        st.session_state.kovetkezo_kor = True  # 3. kör után ez már nem fut le, így nincs visszaállítva, így nem kezdődik új kör
+                    if not eredmeny.jatek_vege:
                         st.success(
                             "Egyelőre nincs sok idő örömködni. Vajon ezúttal mire gondolt a gép? Válaszd ki a fenti legördülő listából, aztán kattints a Küldés gombra! \n\nAmint leadod a következő kör első tippjét, újra el is indul a számláló."
                         )
 
                     else:
-                        ranglistahoz(
-                            Játékosnév=st.session_state.Játékosnév,
-                            total_time=st.session_state.total_time,
-                            total_tipp_szam=st.session_state.total_tipp_szam,
-                            start_time=st.session_state.start_time,
-                            pontos_start_time=datetime.fromtimestamp(
-                                round(st.session_state.start_time)
-                            ),
-                        )  # eltárolok minden eredményt egy csv file-ban
-
-                        total_time_perc = int(st.session_state.total_time // 60)
-                        total_time_masodperc = int(st.session_state.total_time % 60)
-
-                        ranglista = ranglista_meghivasa("ranglista6.csv")
-
-                        ranglista_time = ranglista.sort_values(
-                            ["Össz. idő (mp)", "Össz. tipp szám"]
-                        ).reset_index()
-                        helyezes_time = (
-                            ranglista_time[
-                                ranglista_time["start_time"]
-                                == st.session_state.start_time
-                            ].index[0]
-                            + 1
-                        )  # a start_time-ot használom kb. ID-ként (ez az, ami egyedi)
-
-                        ranglista_tipp = ranglista.sort_values(
-                            ["Össz. tipp szám", "Össz. idő (mp)"]
-                        ).reset_index()
-                        helyezes_tipp = (
-                            ranglista_tipp[
-                                ranglista_tipp["start_time"]
-                                == st.session_state.start_time
-                            ].index[0]
-                            + 1
-                        )
+                        metrikak.novel("befejezett_jatekok", mod="kompetitiv")
+                        total_time_perc = int(menet.ossz_ido // 60)
+                        total_time_masodperc = int(menet.ossz_ido % 60)
 
                         st.success(
-                            f"A 3 kör teljesítéséhez összesen {st.session_state.total_tipp_szam} tippre és {total_time_perc} perc {total_time_masodperc} másodpercre volt szükséged. Ezzel a ranglista {helyezes_tipp}. helyére kerültél tipp szám és a(z) {helyezes_time}. helyére idő alapján."
+                            f"A 3 kör teljesítéséhez összesen {menet.ossz_tipp_szam} tippre és {total_time_perc} perc {total_time_masodperc} másodpercre volt szükséged. Ezzel a ranglista {eredmeny.helyezes_tipp}. helyére kerültél tipp szám és a(z) {eredmeny.helyezes_ido}. helyére idő alapján."
                         )
                         st.balloons()
 
-                        ranglista = ranglista.sort_values(
-                            ["Össz. idő (mp)", "Össz. tipp szám"]
-                        ).reset_index()
-
                         st.write("A TOP10 leggyorsabb ranglistája így néz ki jelenleg:")
+                        with meres("ranglista"):
+                            top10 = ranglista_meghivasa().top(10)
                         st.dataframe(
-                            ranglista.head(n=10),
+                            top10,
                             hide_index=True,
                             column_order=(
                                 "Játékosnév",
@@ -378,15 +285,35 @@ def kompetitiv_jatek(coordinates):
         új_játék_indítása()
 
 
+def metrika_panel():
+    """Hibakereső panel a mérésekkel (csak ha BALATON_METRIKAK_PANEL=1 és a mérés be van kapcsolva, lásd metrikak.py)."""
+
+    with st.expander("Mérések (hibakereséshez)"):
+        pillanatkep = metrikak.pillanatkep()
+        st.dataframe(pillanatkep["szakaszok"], use_container_width=True)
+        st.json({"számlálók": pillanatkep["szamlalok"], "mércék": pillanatkep["mercek"]})
+        st.download_button(
+            "Prometheus export letöltése",
+            metrikak.prometheus_szoveg(),
+            file_name="metrikak.prom",
+            mime="text/plain",
+        )
+
+
 def main():
     """A kiinduló állapot meghívásához szükséges függvény. A fájl lefuttatásakor ez van meghívva. Az alap userface megjelenítését segíti."""
 
+    # a mérés alapból ki van kapcsolva, ilyenkor a futas() és a meres() semmit sem csinál
+    with metrikak.futas():
+        _main()
+    if metrikak.bekapcsolva() and os.environ.get("BALATON_METRIKAK_PANEL") == "1":
+        metrika_panel()
+
+
+def _main():
     st.title("Neked a tenger a Balaton?")
 
-    if "jatekvalasztofelirat" not in st.session_state:
-        st.session_state.jatekvalasztofelirat = (
-            "Egyszerű játékot szeretnél vagy kompetitív alkat vagy?"
-        )
+    # a munkamenetben csak egy jelzőt tartunk, maga a felirat a kódban van
     if "jatekvalasztofelirat_allapot" not in st.session_state:
         st.session_state.jatekvalasztofelirat_allapot = True
     if st.session_state.jatekvalasztofelirat_allapot == True:
@@ -395,17 +322,28 @@ def main():
         )
         # ezt biztos lehet szebben is, de így működik az, hogy csak akkor írja ki, amikor valóban ki kell írni
 
-    url_data = "https://raw.githubusercontent.com/nlemu/prog1-projekt-vegleges/main/coordinates.xlsx"
-    response = requests.get(url_data)
-    coordinates = pd.read_excel(BytesIO(response.content))
+    # a GitHubról csak akkor frissítünk (a háttérben), ha ezt külön kérjük, egyébként a helyi fájlt használjuk
+    if os.environ.get("BALATON_TAVOLI_FRISSITES") == "1":
+        hatter_frissites_inditasa()
+    # a háttértérkép, a megoldó stb. előkészítése a háttérben, amíg az első játékos még a játék típusát választja
+    # (a szerver indítása előtti bemelegítéshez lásd: python bemelegites.py)
+    if os.environ.get("BALATON_BEMELEGITES") == "1":
+        hatter_bemelegites_inditasa()
+    # pandas nélkül, közvetlenül az npz gyorsítótárból (betoltes.py)
+    with meres("betoltes"):
+        coordinates = koordinata_oszlopok()
+    with meres("nevtar"):
+        nevtar = helysegnevtar_betoltese(
+            coordinates, motor=os.environ.get("BALATON_TAVOLSAG_MOTOR", "geodesic")
+        )
 
     jatek_tipus_valasztas()
 
     if st.session_state.típus == "egyszerű":
-        egyszeru_jatek(coordinates)
+        egyszeru_jatek(nevtar)
 
     if st.session_state.típus == "kompetitív":
-        kompetitiv_jatek(coordinates)
+        kompetitiv_jatek(nevtar)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,304 @@
+"""A játék logikája a streamlit felülettől függetlenül.
+
+A GameSession egy (egyszerű, 1 körös vagy kompetitív, 3 körös) játék teljes állapotát tartja:
+a gép gondolatát és a tippelt városokat a helységnévtárbeli egész sorszámukkal, a számlálókat és
+az időket. A streamlit oldalak csak ezt hívják, így a játékot felület nélkül is lehet futtatni,
+mérni és terhelni (lásd: terheles.py).
+"""
+
+import random
+import time
+import uuid
+from array import array
+from collections import namedtuple
+from datetime import datetime
+
+from metrikak import meres
+
+# ezt adja vissza a jatek(), ha eltalálta a játékos a gép gondolatát
+TALALAT = "    "
+KOMPETITIV_KOROK = 3
+
+TippEredmeny = namedtuple(
+    "TippEredmeny",
+    [
+        "uzenet",  # a jatek() szöveges válasza
+        "talalt",  # eltalálta-e a gép gondolatát
+        "kor",  # hányadik körben volt a tipp
+        "kor_tipp_szam",  # az adott kör tippjeinek száma (ezzel a tippel együtt)
+        "kor_ido",  # a kör ideje mp-ben (csak ha talalt)
+        "jatek_vege",  # ezzel a tippel véget ért-e az egész játék
+        "azonosito",  # a ranglista bejegyzés azonosítója (kompetitív játék végén)
+        "helyezes_ido",  # helyezés idő alapján (kompetitív játék végén)
+        "helyezes_tipp",  # helyezés tipp szám alapján (kompetitív játék végén)
+    ],
+    defaults=(None, False, None, None, None, None),
+)
+
+
+def uzenet(nevtar, gep, tip):
+    """A jatek() válasza a helységnévtárbeli sorszámok alapján."""
+
+    if gep == tip:
+        return TALALAT
+
+    # a távolságok a helységnévtár betöltésekor előre ki vannak számolva (helysegnevtar.py)
+    tavolsagok, eszakdel_km, keletnyugat_km = nevtar.sor(gep)
+    dif_lat = eszakdel_km[tip]
+    dif_long = keletnyugat_km[tip]
+    distance = float(tavolsagok[tip])
+    tipp = nevtar.varosok[tip]
+
+    # kicsit necces, hogy a pontos távolság Haversine formulával van számolva, viszont az, hogy mennyire van délre/északra/keletre/nyugatra dolgok meg laposföldhöz van viszonyítva
+
+    gep_lat, gep_long = nevtar.latitude[gep], nevtar.longitude[gep]
+    tipp_lat, tipp_long = nevtar.latitude[tip], nevtar.longitude[tip]
+
+    eszakdel = "" if dif_lat < 3 else ("észak" if gep_lat > tipp_lat else "dél")
+    nyugatkelet = (
+        "" if dif_long < 3 else ("kelet" if gep_long > tipp_long else "nyugat")
+    )
+    # ha az észak/dél/nyugat/kelet távolság kisebb, mint 3km, akkor azt nem írja ki (így pl. csak annyit ír, hogy "4,6km-re nyugatra")
+
+    if dif_lat < 3 and dif_long < 3:
+        return f"A gép által kigondolt város {tipp} településhez viszonyítva {round(distance, 2)} km-re található."
+    # ha az észak/dél és nyugat/kelet is 3km-en belül van, akkor egyiket se írja ki, csak a konkrét távolságot
+
+    return f"A gép által kigondolt város {tipp} településhez viszonyítva {round(distance, 2)} km-re {eszakdel}{nyugatkelet} irányba található."
+
+
+# az alapjátékhoz szükséges függvény
+def jatek(tipp, nevtar, gepgondolata):
+    """Inputként megkapja a játékos által tippelt várost,
+    ha nem egyezik meg a gép gondolatával, akkor visszaadja, hogy milyen irányba és milyen távolságra található tőle.
+    Ha megegyezik a gép gondolata a tippelt várossal, akkor egy space-t (" ") ad visszatérési értékként, amivel vége a játéknak/adott körnek.
+    """
+
+    if gepgondolata == tipp:
+        return TALALAT
+    elif tipp not in nevtar:
+        return "Sajnos a tippelt város nem szerepel az adatbázisomban. Ügyelj arra, hogy a településnevet nagybetűvel kezdve, ékezettel írd le!"
+        # teszteléseim alapján nincs erre szükség, mert legördülő listából nem is enged mást választani, de a streamlit tud annyira szeszélyes lenni, hogy inkább bennehagyom
+        # (azt feltételezve, hogy mégis lehet valahogyan nem értelmes inputot leadni tippként), nehogy ennek hiánya okozzon gondot a futásnál
+    else:
+        return uzenet(nevtar, nevtar.index[gepgondolata], nevtar.index[tipp])
+
+
+class GameSession:
+    """Egy játék állapota. Egyszerű játékhoz korok_szama=1, kompetitívhez KOMPETITIV_KOROK.
+
+    Kompetitív játéknál (ha van jatekosnev és ranglista) a játék végén az eredmény bekerül a
+    ranglistába (aminek hozzaad() és helyezesek() metódusa kell legyen, lásd ranglista_index.py).
+    A nehezseg a terbeli_index.NEHEZSEGI_SZINTEK egyike lehet, ilyenkor a gép csak az adott
+    szintű (sűrűségű környezetű) települések közül választ; None esetén az összes közül.
+    Ha van naplo (esemenynaplo.EsemenyNaplo), minden tipp, kör vége és játék vége esemény bekerül.
+    """
+
+    __slots__ = (
+        "nevtar",
+        "korok_szama",
+        "jatekosnev",
+        "ranglista",
+        "kor",
+        "cel",
+        "kor_tippjei",
+        "kor_tipp_szam",
+        "ossz_tipp_szam",
+        "kor_kezdete",
+        "ossz_ido",
+        "start_time",
+        "kor_lezarva",
+        "vege",
+        "azonosito",
+        "nehezseg",
+        "naplo",
+        "jatek_id",
+        "_kezdet_naplozva",
+        "_ora",
+        "_veletlen",
+    )
+
+    def __init__(
+        self,
+        nevtar,
+        korok_szama=1,
+        jatekosnev=None,
+        ranglista=None,
+        ora=time.time,
+        veletlen=None,
+        nehezseg=None,
+        naplo=None,
+    ):
+        self.nevtar = nevtar
+        self.korok_szama = korok_szama
+        self.jatekosnev = jatekosnev
+        self.ranglista = ranglista
+        self.nehezseg = nehezseg
+        self.naplo = naplo
+        self.jatek_id = uuid.uuid4().hex[:16] if naplo is not None else None
+        self._ora = ora
+        self._veletlen = veletlen or random
+        self.start_time = ora()
+        self.ossz_tipp_szam = 0
+        self.ossz_ido = 0.0
+        self.vege = False
+        self.azonosito = None
+        self.kor = 0
+        # a "kezdet" esemény csak az első tippnél kerül a naplóba: az egyszerű játék menete már az
+        # oldal megjelenésekor létrejön, de egy tipp nélkül elhagyott oldal még nem játék
+        self._kezdet_naplozva = False
+        self._kor_inditasa()
+
+    def _esemeny(self, tipus, **adatok):
+        if self.naplo is not None:
+            self.naplo.esemeny(tipus, jatek=self.jatek_id, ido=round(self._ora(), 3), **adatok)
+
+    def _kor_inditasa(self):
+        self.kor += 1
+        if self.nehezseg is None:
+            self.cel = self._veletlen.randrange(len(self.nevtar))
+        else:
+            szint = self.nevtar.terbeli_index.nehezsegi_szintek()[self.nehezseg]
+            self.cel = int(szint[self._veletlen.randrange(len(szint))])
+        self.kor_tippjei = array("i")  # a térképhez: az adott kör tippelt városainak sorszámai
+        self.kor_tipp_szam = 0
+        self.kor_kezdete = self._ora()
+        self.kor_lezarva = False
+
+    @property
+    def gepgondolata(self):
+        """A gép által kigondolt település neve."""
+
+        return self.nevtar.varosok[self.cel]
+
+    @property
+    def tippelt_varosok(self):
+        """Az aktuális kör tippelt városai (nevek, tippelés sorrendjében, ismétlés nélkül)."""
+
+        return [self.nevtar.varosok[i] for i in dict.fromkeys(self.kor_tippjei)]
+
+    def kovetkezo_kor(self):
+        """A következő kör indítása, miután az előző lezárult (kompetitív játékban)."""
+
+        if not self.kor_lezarva or self.vege:
+            raise RuntimeError(
+                "Új kört csak egy lezárt kör után, a játék vége előtt lehet indítani."
+            )
+        self._kor_inditasa()
+
+    def segitseg(self):
+        """A gép gondolatához legközelebbi, ebben a körben még nem tippelt település:
+        (név, távolság km-ben), vagy None, ha nincs ilyen."""
+
+        sorszam, tav = self.nevtar.terbeli_index.legkozelebbi_nem_tippelt(
+            self.cel, self.kor_tippjei
+        )
+        if sorszam is None:
+            return None
+        return self.nevtar.varosok[sorszam], tav
+
+    def tipp(self, varos):
+        """Egy tipp kiértékelése településnév alapján."""
+
+        if varos not in self.nevtar:
+            self._tipp_ellenorzes()
+            self.kor_tipp_szam += 1
+            valasz = jatek(varos, self.nevtar, self.gepgondolata)
+            return TippEredmeny(valasz, False, self.kor, self.kor_tipp_szam)
+        return self.tipp_id(self.nevtar.index[varos])
+
+    def tipp_id(self, tip):
+        """Egy tipp kiértékelése a település sorszáma alapján."""
+
+        self._tipp_ellenorzes()
+        self.kor_tipp_szam += 1
+        self.kor_tippjei.append(tip)
+        valasz = uzenet(self.nevtar, self.cel, tip)
+        if not self._kezdet_naplozva:
+            self._kezdet_naplozva = True
+            self._esemeny(
+                "kezdet",
+                korok=self.korok_szama,
+                jatekosnev=self.jatekosnev,
+                nehezseg=self.nehezseg,
+                start_time=self.start_time,
+            )
+        self._esemeny(
+            "tipp",
+            kor=self.kor,
+            n=self.kor_tipp_szam,
+            cel=self.gepgondolata,
+            tipp=self.nevtar.varosok[tip],
+            talalt=tip == self.cel,
+        )
+
+        if tip != self.cel:
+            return TippEredmeny(valasz, False, self.kor, self.kor_tipp_szam)
+
+        kor_ido = self._ora() - self.kor_kezdete
+        self.ossz_tipp_szam += self.kor_tipp_szam
+        self.ossz_ido += kor_ido
+        self.kor_lezarva = True
+        self._esemeny(
+            "kor_vege",
+            kor=self.kor,
+            cel=self.gepgondolata,
+            tippek=self.kor_tipp_szam,
+            kor_ido=round(kor_ido, 3),
+        )
+
+        if self.kor < self.korok_szama:
+            return TippEredmeny(valasz, True, self.kor, self.kor_tipp_szam, kor_ido, False)
+
+        self.vege = True
+        helyezes_ido = helyezes_tipp = None
+        if self.ranglista is not None and self.jatekosnev is not None:
+            with meres("ranglista"):
+                self.azonosito = self.ranglista.hozzaad(
+                    self.jatekosnev,
+                    self.ossz_ido,
+                    self.ossz_tipp_szam,
+                    self.start_time,
+                    datetime.fromtimestamp(round(self.start_time)),
+                )
+                helyezes_ido, helyezes_tipp = self.ranglista.helyezesek(self.azonosito)
+        self._esemeny(
+            "jatek_vege",
+            korok=self.korok_szama,
+            ossz_ido=self.ossz_ido,
+            ossz_tipp=self.ossz_tipp_szam,
+            jatekosnev=self.jatekosnev,
+            start_time=self.start_time,
+            mikor_jatszott=str(datetime.fromtimestamp(round(self.start_time))),
+            azonosito=self.azonosito,
+        )
+        return TippEredmeny(
+            valasz,
+            True,
+            self.kor,
+            self.kor_tipp_szam,
+            kor_ido,
+            True,
+            self.azonosito,
+            helyezes_ido,
+            helyezes_tipp,
+        )
+
+    def feladas(self):
+        """A játék félbehagyása (pl. új játékot kezd a játékos); csak a naplóba kerül be, és csak ha
+        már volt tipp (a bezárt lapokat és lejárt munkameneteket a Statisztika számolja, lásd
+        esemenynaplo.FELHAGYASI_IDO)."""
+
+        if not self.vege:
+            self.vege = True
+            if not self._kezdet_naplozva:
+                return
+            self._esemeny(
+                "feladva",
+                kor=self.kor,
+                ossz_tipp=self.ossz_tipp_szam + (0 if self.kor_lezarva else self.kor_tipp_szam),
+            )
+
+    def _tipp_ellenorzes(self):
+        if self.kor_lezarva:
+            raise RuntimeError("Ez a kör már lezárult, nem lehet többet tippelni.")
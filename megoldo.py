@@ -0,0 +1,213 @@
+"""Jelöltkizárásos megoldó: a még lehetséges célpontokat (a gép gondolatát) egy numpy bool maszkban
+tartja, és minden tipp válasza után egyetlen vektorizált művelettel szűkíti.
+
+A jatek() válasza egy tippre a célpont és a tipp közötti, 2 tizedesre kerekített távolság és a
+(3 km-es küszöbbel számolt) észak/dél, kelet/nyugat irány. Ezt egy egész számba kódoljuk
+(valasz_kulcs), így egy tipp után a maszk: maszk &= (kulcsok(tipp) == a kapott kulcs).
+
+A legjobb következő tipp az, amelyik után a várható megmaradó jelöltszám a legkisebb: ha a jelöltek
+egy tipp szerint |G1|, |G2|, ... méretű csoportokra esnek szét (egy csoport = egy lehetséges
+válasz), a várható érték sum(|Gi|^2) / n (a telitalálat csoportja 0 jelöltet hagy).
+
+Felhasználás: "Mit tippeljek?" gomb az egyszerű játékban (interface.py), megoldó bot a
+terheléses szimulátorhoz (terheles.py, --bot megoldo), és a célpontok nehézségének mérése
+(nehezseg_pontszamok, illetve python megoldo.py).
+
+Több ezer település esetén a kiértékelést mintavételezve végezzük (JELOLT_MINTA jelölt és
+TIPP_MINTA lehetséges tipp), így egy javaslat is néhány ms, a nyitó tippet pedig
+helységnévtáranként egyszer számoljuk ki.
+"""
+
+import argparse
+import threading
+
+import numpy as np
+
+import tavolsag
+
+# e fölött mintavételezünk a legjobb tipp keresésénél
+JELOLT_MINTA = 512
+TIPP_MINTA = 512
+
+# a telitalálat kulcsa (minden más kulcs nemnegatív)
+TALALAT_KULCS = -1
+
+_IRANY = 3  # irány kódok száma: 0 = nincs kiírva (3 km alatt), 1 = észak/kelet, 2 = dél/nyugat
+
+
+def _kulcsok(nevtar, celok, tippek):
+    """A jatek() válaszának kódja minden (cél, tipp) párra: len(celok) x len(tippek) int64 tömb.
+
+    Ugyanazokat az értékeket használja, mint a jatekmotor.uzenet(): a helységnévtár [gép gondolata,
+    tipp] mátrixait, ha vannak, egyébként ugyanazt a motort vektorizálva (tavolsag.egy_a_tobbhoz)."""
+
+    celok = np.asarray(celok, dtype=np.int64)
+    tippek = np.asarray(tippek, dtype=np.int64)
+    if nevtar.tavolsag_km is not None:
+        tav = nevtar.tavolsag_km[np.ix_(celok, tippek)]
+        eszakdel = nevtar.eszakdel_km[np.ix_(celok, tippek)]
+        keletnyugat = nevtar.keletnyugat_km[np.ix_(celok, tippek)]
+    else:
+        cel_lat = nevtar.latitude[celok][:, None]
+        cel_lon = nevtar.longitude[celok][:, None]
+        tav, eszakdel, keletnyugat = tavolsag.egy_a_tobbhoz(
+            cel_lat,
+            cel_lon,
+            nevtar.latitude[tippek][None, :],
+            nevtar.longitude[tippek][None, :],
+            motor_nev=nevtar.motor,
+        )
+
+    cel_lat = nevtar.latitude[celok][:, None]
+    cel_lon = nevtar.longitude[celok][:, None]
+    ed = np.where(eszakdel < 3, 0, np.where(cel_lat > nevtar.latitude[tippek][None, :], 1, 2))
+    kn = np.where(keletnyugat < 3, 0, np.where(cel_lon > nevtar.longitude[tippek][None, :], 1, 2))
+    centi = np.rint(np.round(tav, 2) * 100).astype(np.int64)
+    kulcs = (centi * _IRANY + ed) * _IRANY + kn
+    return np.where(celok[:, None] == tippek[None, :], TALALAT_KULCS, kulcs)
+
+
+def valasz_kulcs(nevtar, cel, tipp):
+    """A jatek() válaszának kódja, ha a gép gondolata cel és a tipp tipp (sorszámok)."""
+
+    return int(_kulcsok(nevtar, [cel], [tipp])[0, 0])
+
+
+def _varhato_maradek(kulcsok):
+    """Minden oszlopra (tippre): a várható megmaradó jelöltszám, ha a sorok (jelöltek) egyformán
+    valószínűek. Oszloponként rendezünk, és a csoportméretek négyzetösszegét számoljuk."""
+
+    n, m = kulcsok.shape
+    rendezett = np.sort(kulcsok, axis=0).ravel(order="F")
+    uj_csoport = np.ones(n * m, dtype=bool)
+    uj_csoport[1:] = rendezett[1:] != rendezett[:-1]
+    uj_csoport[::n] = True  # minden oszlop új csoporttal kezdődik
+    kezdetek = np.flatnonzero(uj_csoport)
+    meretek = np.diff(np.append(kezdetek, n * m))
+    negyzetek = np.where(rendezett[kezdetek] == TALALAT_KULCS, 0, meretek**2)
+    return np.bincount(kezdetek // n, weights=negyzetek, minlength=m) / n
+
+
+def _minta(sorszamok, meret):
+    """Egyenletes lépésközű (determinisztikus) minta a sorszámokból."""
+
+    if len(sorszamok) <= meret:
+        return sorszamok
+    return sorszamok[np.linspace(0, len(sorszamok) - 1, meret).astype(np.int64)]
+
+
+def legjobb_tipp(nevtar, jeloltek):
+    """A jeloltek (sorszámok) közül a célpont kitalálásához legjobb következő tipp:
+    (sorszám, várható megmaradó jelöltszám). Egyenlőségnél a jelöltek közül választ (mert az
+    akár telitalálat is lehet), utána a kisebb sorszámút."""
+
+    jeloltek = np.asarray(jeloltek, dtype=np.int64)
+    if len(jeloltek) == 0:
+        raise ValueError("Nincs a válaszoknak megfelelő település.")
+    if len(jeloltek) <= 2:
+        return int(jeloltek[0]), (len(jeloltek) - 1) / len(jeloltek)
+
+    mind = np.arange(len(nevtar), dtype=np.int64)
+    tippek = np.union1d(_minta(jeloltek, TIPP_MINTA), _minta(mind, TIPP_MINTA))
+    ertekek = _varhato_maradek(_kulcsok(nevtar, _minta(jeloltek, JELOLT_MINTA), tippek))
+
+    # a jelöltek közül választás előnyt kap egyenlőség esetén
+    jelolt_e = np.isin(tippek, jeloltek)
+    legjobb = np.lexsort((tippek, ~jelolt_e, ertekek))[0]
+    return int(tippek[legjobb]), float(ertekek[legjobb])
+
+
+class Megoldo:
+    """Egy kör jelöltjei (bool maszk a helységnévtár sorszámai szerint)."""
+
+    def __init__(self, nevtar):
+        self.nevtar = nevtar
+        self.maszk = np.ones(len(nevtar), dtype=bool)
+
+    @property
+    def jeloltek(self):
+        """A még lehetséges célpontok sorszámai."""
+
+        return np.flatnonzero(self.maszk)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.maszk))
+
+    def szukites(self, tipp, kulcs):
+        """A maszk szűkítése egy tipp és a rá kapott válasz (valasz_kulcs) alapján."""
+
+        jeloltek = self.jeloltek
+        self.maszk[jeloltek] = _kulcsok(self.nevtar, jeloltek, [tipp])[:, 0] == kulcs
+
+    def legjobb_tipp(self):
+        """(sorszám, várható megmaradó jelöltszám); a teljes helységnévtárra gyorsítótárazva."""
+
+        if self.maszk.all():
+            return nyito_tipp(self.nevtar)
+        return legjobb_tipp(self.nevtar, self.jeloltek)
+
+
+_nyitok = {}
+_nyito_zar = threading.Lock()
+
+
+def nyito_tipp(nevtar):
+    """A legjobb első tipp (minden játékban ugyanaz), helységnévtár-változatonként egyszer."""
+
+    with _nyito_zar:
+        talalat = _nyitok.get(nevtar.verzio)
+    if talalat is None:
+        talalat = legjobb_tipp(nevtar, np.arange(len(nevtar)))
+        with _nyito_zar:
+            _nyitok[nevtar.verzio] = talalat
+    return talalat
+
+
+def menet_megoldoja(menet):
+    """Egy jatekmotor.GameSession aktuális körének megoldója (az eddigi tippek alapján)."""
+
+    megoldo = Megoldo(menet.nevtar)
+    for tipp in dict.fromkeys(menet.kor_tippjei):
+        megoldo.szukites(tipp, valasz_kulcs(menet.nevtar, menet.cel, tipp))
+    return megoldo
+
+
+def tippek_szama(nevtar, cel, max_tipp=None):
+    """Hány tippből találja ki a megoldó a cel sorszámú települést."""
+
+    megoldo = Megoldo(nevtar)
+    max_tipp = max_tipp or len(nevtar)
+    for szam in range(1, max_tipp + 1):
+        tipp, _ = megoldo.legjobb_tipp()
+        if tipp == cel:
+            return szam
+        megoldo.szukites(tipp, valasz_kulcs(nevtar, cel, tipp))
+    return max_tipp
+
+
+def nehezseg_pontszamok(nevtar, celok=None):
+    """Célpontonként a megoldónak szükséges tippek száma (offline nehézségi pontszám)."""
+
+    celok = range(len(nevtar)) if celok is None else celok
+    return {int(cel): tippek_szama(nevtar, cel) for cel in celok}
+
+
+def main():
+    from betoltes import koordinatak_betoltese
+    from helysegnevtar import helysegnevtar_betoltese
+
+    parser = argparse.ArgumentParser(
+        description="A települések nehézsége: hány tippből találja ki őket a megoldó."
+    )
+    parser.add_argument("--motor", default="geodesic", choices=sorted(tavolsag.MOTOROK))
+    args = parser.parse_args()
+
+    nevtar = helysegnevtar_betoltese(koordinatak_betoltese(), motor=args.motor)
+    pontszamok = nehezseg_pontszamok(nevtar)
+    for cel, szam in sorted(pontszamok.items(), key=lambda p: (-p[1], nevtar.varosok[p[0]])):
+        print(f"{szam:3d}  {nevtar.varosok[cel]}")
+    print(f"átlag: {np.mean(list(pontszamok.values())):.2f} tipp")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Könnyűsúlyú időmérés és számlálók a játék lépéseihez (letöltés, xlsx, rendezés, jatek, térkép,
+ranglista), hogy éles használatban is látszódjon, hol megy el az idő egy kattintásnál.
+
+A mért szakaszok folyamatonként hisztogramokba gyűlnek, mellettük számlálók vannak (újrafuttatások,
+tippek, befejezett játékok) és a ranglista méretét is nyilvántartjuk. Alapból minden ki van
+kapcsolva: ilyenkor a meres() egy közös, üres context managert ad vissza, tehát egy szakasz mérése
+egyetlen függvényhívásba kerül. Bekapcsolni környezeti változókkal lehet:
+
+- BALATON_METRIKAK=1: a mérés bekapcsolása,
+- BALATON_METRIKAK_NAPLO=utvonal: minden újrafuttatás szakaszai egy JSON sorként ide íródnak,
+- BALATON_METRIKAK_PORT=9100: Prometheus szöveges formátum a http://host:port/metrics címen,
+- BALATON_METRIKAK_PANEL=1: hibakereső panel az alkalmazás alján (interface.py).
+
+A napló vagy a port megadása magában is bekapcsolja a mérést.
+
+A szakaszok kizárólagosak: ha egy mérés egy másikon belül fut (pl. a játék végi "ranglista" a
+"jatek"-on belül), a belső ideje csak a belső szakaszhoz számít, a külsőből levonjuk. Így egy
+újrafuttatás szakaszainak összege sosem több az újrafuttatás teljes idejénél.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from datetime import datetime
+
+# a hisztogram felső határai másodpercben (Prometheus "le" címkék), a +Inf-et külön kezeljük
+HATAROK = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ELOTAG = "balaton_"
+
+_URES = nullcontext()
+_bekapcsolva = False
+_naplo_utvonal = None
+_zar = threading.Lock()
+_hisztogramok = {}  # szakasz -> [vödrök darabszáma..., összeg, darabszám]
+_szamlalok = {}  # (név, címkék) -> érték
+_mercek = {}  # (név, címkék) -> érték (pl. ranglista mérete)
+_futas = threading.local()  # az aktuális újrafuttatás szakaszai (szálanként, a streamlit szálain)
+_szerver = None
+
+
+class _Meres:
+    __slots__ = ("nev", "kezdet", "belso")
+
+    def __init__(self, nev):
+        self.nev = nev
+
+    def __enter__(self):
+        verem = getattr(_futas, "verem", None)
+        if verem is None:
+            verem = _futas.verem = []
+        verem.append(self)
+        self.belso = 0.0  # a beágyazott mérések ideje
+        self.kezdet = time.perf_counter()
+        return self
+
+    def __exit__(self, *hiba):
+        teljes = time.perf_counter() - self.kezdet
+        verem = _futas.verem
+        verem.pop()
+        if verem:
+            verem[-1].belso += teljes
+        rogzites(self.nev, teljes - self.belso)
+        return False
+
+
+def meres(nev):
+    """Egy szakasz mérése: with meres("terkep"): ... (kikapcsolva semmit sem csinál)."""
+
+    if not _bekapcsolva:
+        return _URES
+    return _Meres(nev)
+
+
+def rogzites(nev, masodperc):
+    """Egy már lemért szakasz hozzáadása a hisztogramhoz (és az aktuális újrafuttatáshoz)."""
+
+    if not _bekapcsolva:
+        return
+    with _zar:
+        hisztogram = _hisztogramok.get(nev)
+        if hisztogram is None:
+            hisztogram = _hisztogramok[nev] = [0] * (len(HATAROK) + 3)
+        hisztogram[bisect_left(HATAROK, masodperc)] += 1
+        hisztogram[-2] += masodperc
+        hisztogram[-1] += 1
+    szakaszok = getattr(_futas, "szakaszok", None)
+    if szakaszok is not None:
+        szakaszok[nev] = szakaszok.get(nev, 0.0) + masodperc
+
+
+def _kulcs(nev, cimkek):
+    return nev, tuple(sorted(cimkek.items()))
+
+
+def novel(nev, ertek=1, **cimkek):
+    """Számláló növelése, pl. novel("tippek") vagy novel("befejezett_jatekok", mod="egyszeru")."""
+
+    if not _bekapcsolva:
+        return
+    kulcs = _kulcs(nev, cimkek)
+    with _zar:
+        _szamlalok[kulcs] = _szamlalok.get(kulcs, 0) + ertek
+
+
+def beallit(nev, ertek, **cimkek):
+    """Egy pillanatnyi érték (mérce) beállítása, pl. beallit("ranglista_meret", len(ranglista))."""
+
+    if not _bekapcsolva:
+        return
+    with _zar:
+        _mercek[_kulcs(nev, cimkek)] = ertek
+
+
+class _Futas:
+    """Egy streamlit újrafuttatás teljes ideje és szakaszai; a végén kiírja a JSON sort."""
+
+    __slots__ = ("kezdet",)
+
+    def __enter__(self):
+        _futas.szakaszok = {}
+        self.kezdet = time.perf_counter()
+        return self
+
+    def __exit__(self, *hiba):
+        ossz = time.perf_counter() - self.kezdet
+        szakaszok = _futas.szakaszok
+        _futas.szakaszok = None
+        rogzites("futas", ossz)
+        novel("futasok")
+        if _naplo_utvonal is not None:
+            _naplo_iras(
+                {
+                    "ido": datetime.now().isoformat(timespec="milliseconds"),
+                    "szal": threading.current_thread().name,
+                    "ossz_ms": round(ossz * 1000, 3),
+                    "szakaszok_ms": {n: round(mp * 1000, 3) for n, mp in szakaszok.items()},
+                    "hiba": hiba[0].__name__ if hiba[0] is not None else None,
+                }
+            )
+        return False
+
+
+def futas():
+    """Egy újrafuttatás keretezése (interface.main): with futas(): ..."""
+
+    if not _bekapcsolva:
+        return _URES
+    return _Futas()
+
+
+def _naplo_iras(rekord):
+    sor = json.dumps(rekord, ensure_ascii=False) + "\n"
+    try:
+        with _zar, open(_naplo_utvonal, "a", encoding="utf-8") as f:
+            f.write(sor)
+    except OSError:
+        pass  # a napló hibája miatt ne álljon meg a játék
+
+
+def pillanatkep():
+    """Az összes mérés és számláló másolata (a panelhez és a JSON exporthoz)."""
+
+    with _zar:
+        hisztogramok = {nev: list(h) for nev, h in _hisztogramok.items()}
+        szamlalok = dict(_szamlalok)
+        mercek = dict(_mercek)
+
+    szakaszok = {}
+    for nev, h in sorted(hisztogramok.items()):
+        darab = h[-1]
+        szakaszok[nev] = {
+            "darab": darab,
+            "osszeg_mp": h[-2],
+            "atlag_ms": h[-2] / darab * 1000 if darab else 0.0,
+            "p50_ms": _becsult_percentilis(h, 0.5) * 1000,
+            "p90_ms": _becsult_percentilis(h, 0.9) * 1000,
+            "p99_ms": _becsult_percentilis(h, 0.99) * 1000,
+        }
+
+    def cimkezve(ertekek):
+        return {
+            nev + "".join(f"[{k}={v}]" for k, v in cimkek): ertek
+            for (nev, cimkek), ertek in sorted(ertekek.items())
+        }
+
+    return {"szakaszok": szakaszok, "szamlalok": cimkezve(szamlalok), "mercek": cimkezve(mercek)}
+
+
+def _becsult_percentilis(hisztogram, q):
+    """A percentilis felső becslése a vödrökből (a vödör felső határa, ahogy a Prometheus is)."""
+
+    darab = hisztogram[-1]
+    if not darab:
+        return 0.0
+    cel = q * darab
+    osszes = 0
+    for hatar, db in zip(HATAROK, hisztogram):
+        osszes += db
+        if osszes >= cel:
+            return hatar
+    return float("inf")
+
+
+def _cimke_szoveg(cimkek):
+    if not cimkek:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in cimkek) + "}"
+
+
+def prometheus_szoveg():
+    """Az összes mérés Prometheus szöveges (text/plain; version=0.0.4) formátumban."""
+
+    with _zar:
+        hisztogramok = {nev: list(h) for nev, h in _hisztogramok.items()}
+        szamlalok = dict(_szamlalok)
+        mercek = dict(_mercek)
+
+    sorok = []
+    nev = ELOTAG + "szakasz_ido_masodperc"
+    sorok.append(f"# HELP {nev} A játék egyes lépéseinek ideje.")
+    sorok.append(f"# TYPE {nev} histogram")
+    for szakasz, h in sorted(hisztogramok.items()):
+        osszes = 0
+        for hatar, db in zip(HATAROK, h):
+            osszes += db
+            sorok.append(f'{nev}_bucket{{szakasz="{szakasz}",le="{hatar}"}} {osszes}')
+        sorok.append(f'{nev}_bucket{{szakasz="{szakasz}",le="+Inf"}} {h[-1]}')
+        sorok.append(f'{nev}_sum{{szakasz="{szakasz}"}} {h[-2]!r}')
+        sorok.append(f'{nev}_count{{szakasz="{szakasz}"}} {h[-1]}')
+
+    for tipus, ertekek, utotag in (("counter", szamlalok, "_total"), ("gauge", mercek, "")):
+        for metrika in sorted({n for n, _ in ertekek}):
+            sorok.append(f"# TYPE {ELOTAG}{metrika}{utotag} {tipus}")
+            for (n, cimkek), ertek in sorted(ertekek.items()):
+                if n == metrika:
+                    sorok.append(f"{ELOTAG}{n}{utotag}{_cimke_szoveg(cimkek)} {ertek}")
+    return "\n".join(sorok) + "\n"
+
+
+def _szerver_inditasa(port):
+    """Egy háttérszálban futó HTTP szerver, ami a /metrics címen a prometheus_szoveg()-et adja."""
+
+    global _szerver
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Kezelo(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            valasz = prometheus_szoveg().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(valasz)))
+            self.end_headers()
+            self.wfile.write(valasz)
+
+        def log_message(self, *args):
+            pass  # ne szemetelje tele a streamlit kimenetét
+
+    _szerver = ThreadingHTTPServer(("", port), Kezelo)
+    threading.Thread(target=_szerver.serve_forever, name="metrikak-http", daemon=True).start()
+
+
+def bekapcsolas(naplo=None, port=None):
+    """A mérés bekapcsolása (folyamatonként; a port csak az első hívásnál számít)."""
+
+    global _bekapcsolva, _naplo_utvonal
+
+    with _zar:
+        _bekapcsolva = True
+        if naplo:
+            _naplo_utvonal = naplo
+        if port and _szerver is None:
+            try:
+                _szerver_inditasa(int(port))
+            except OSError:
+                pass  # pl. több streamlit folyamat ugyanazon a porton: csak az első szolgál ki
+
+
+def kikapcsolas():
+    """A mérés kikapcsolása és az eddigi adatok törlése (pl. a benchmarkhoz)."""
+
+    global _bekapcsolva, _naplo_utvonal
+
+    with _zar:
+        _bekapcsolva = False
+        _naplo_utvonal = None
+        _hisztogramok.clear()
+        _szamlalok.clear()
+        _mercek.clear()
+
+
+def bekapcsolva():
+    return _bekapcsolva
+
+
+if (
+    os.environ.get("BALATON_METRIKAK") == "1"
+    or os.environ.get("BALATON_METRIKAK_NAPLO")
+    or os.environ.get("BALATON_METRIKAK_PORT")
+):
+    bekapcsolas(os.environ.get("BALATON_METRIKAK_NAPLO"), os.environ.get("BALATON_METRIKAK_PORT"))
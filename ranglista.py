@@ -0,0 +1,245 @@
+"""A kompetitív játék ranglistája SQLite adatbázisban.
+
+Korábban minden eredmény egy csv fájl végére került (zárolás nélkül, így egyszerre játszó
+játékosok sorai összekeveredhettek), és a játék végén az egész fájlt be kellett olvasni és
+háromszor sorba rendezni. Itt minden beszúrás egy tranzakció (WAL módban, így az olvasók nem
+blokkolják az írót), a helyezéseket indexelt COUNT lekérdezések adják, a TOP10-et pedig LIMIT.
+
+A régi ranglista6.csv-t az adatbázis első megnyitásakor, egyetlen egyszer importáljuk be
+(amíg a ranglista még üres, lásd regi_csv_importalasa), csv-be pedig továbbra is ki lehet
+menteni a ranglistát. Az export alapból nem a régi fájlba ír:
+
+    python ranglista.py export [ranglista_export.csv]
+"""
+
+import csv
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+
+ADATBAZIS = "ranglista6.sqlite3"
+REGI_CSV = "ranglista6.csv"
+EXPORT_CSV = "ranglista_export.csv"
+
+# a csv fájl (és a megjelenített táblázat) oszlopai
+OSZLOPOK = [
+    "Játékosnév",
+    "Össz. idő (mp)",
+    "Össz. tipp szám",
+    "start_time",
+    "Mikor játszott",
+]
+
+_SEMA = """
+CREATE TABLE IF NOT EXISTS eredmenyek (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jatekosnev TEXT NOT NULL,
+    ossz_ido REAL NOT NULL,
+    ossz_tipp INTEGER NOT NULL,
+    start_time REAL,
+    mikor_jatszott TEXT
+);
+CREATE INDEX IF NOT EXISTS eredmenyek_ido_tipp ON eredmenyek (ossz_ido, ossz_tipp);
+CREATE INDEX IF NOT EXISTS eredmenyek_tipp_ido ON eredmenyek (ossz_tipp, ossz_ido);
+CREATE TABLE IF NOT EXISTS importalt_fajlok (
+    tartalom_hash TEXT PRIMARY KEY,
+    utvonal TEXT
+);
+CREATE TABLE IF NOT EXISTS egyszeri_importok (
+    nev TEXT PRIMARY KEY,
+    utvonal TEXT
+);
+"""
+
+# az egyszeri_importok táblában a régi csv automatikus importjának jelzője
+REGI_CSV_JELZO = "regi_csv"
+
+# a két rangsor: (elsődleges, másodlagos) rendezési oszlop; holtversenynél a korábbi eredmény van elöl
+RENDEZESEK = {
+    "ido": ("ossz_ido", "ossz_tipp"),
+    "tipp": ("ossz_tipp", "ossz_ido"),
+}
+
+
+class Ranglista:
+    """SQLite alapú ranglista. Szálanként külön kapcsolatot nyit (a streamlit több szálon futtat)."""
+
+    def __init__(self, utvonal=ADATBAZIS):
+        self.utvonal = utvonal
+        self._helyi = threading.local()
+        with self._kapcsolat() as kapcsolat:
+            kapcsolat.executescript(_SEMA)
+
+    def _kapcsolat(self):
+        kapcsolat = getattr(self._helyi, "kapcsolat", None)
+        if kapcsolat is None:
+            kapcsolat = sqlite3.connect(self.utvonal, timeout=10)
+            kapcsolat.execute("PRAGMA journal_mode=WAL")
+            kapcsolat.execute("PRAGMA synchronous=NORMAL")
+            self._helyi.kapcsolat = kapcsolat
+        return kapcsolat
+
+    def hozzaad(self, jatekosnev, ossz_ido, ossz_tipp, start_time=None, mikor_jatszott=None):
+        """Egy eredmény beszúrása egy tranzakcióban. Visszaadja az eredmény egyedi azonosítóját."""
+
+        with self._kapcsolat() as kapcsolat:
+            kurzor = kapcsolat.execute(
+                "INSERT INTO eredmenyek (jatekosnev, ossz_ido, ossz_tipp, start_time, mikor_jatszott)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (
+                    jatekosnev,
+                    float(ossz_ido),
+                    int(ossz_tipp),
+                    start_time,
+                    None if mikor_jatszott is None else str(mikor_jatszott),
+                ),
+            )
+            return kurzor.lastrowid
+
+    def helyezes(self, azonosito, rendezes="ido"):
+        """Az adott eredmény helyezése (1-től számozva) a megadott rangsor szerint."""
+
+        elso, masodik = RENDEZESEK[rendezes]
+        kapcsolat = self._kapcsolat()
+        sor = kapcsolat.execute(
+            f"SELECT {elso}, {masodik} FROM eredmenyek WHERE id = ?", (azonosito,)
+        ).fetchone()
+        if sor is None:
+            raise KeyError(azonosito)
+        # sor-érték összehasonlítás: az index (elso, masodik, rowid) sorrendjében előrébb lévők száma
+        (elotte,) = kapcsolat.execute(
+            f"SELECT COUNT(*) FROM eredmenyek WHERE ({elso}, {masodik}, id) < (?, ?, ?)",
+            (sor[0], sor[1], azonosito),
+        ).fetchone()
+        return elotte + 1
+
+    def helyezesek(self, azonosito):
+        """(helyezés idő alapján, helyezés tipp szám alapján)"""
+
+        return self.helyezes(azonosito, "ido"), self.helyezes(azonosito, "tipp")
+
+    def top(self, n=10, rendezes="ido"):
+        """Az első n eredmény a megadott rangsor szerint, a csv oszlopneveivel (pandas DataFrame)."""
+
+        import pandas as pd
+
+        elso, masodik = RENDEZESEK[rendezes]
+        sorok = self._kapcsolat().execute(
+            "SELECT jatekosnev, ossz_ido, ossz_tipp, start_time, mikor_jatszott FROM eredmenyek"
+            f" ORDER BY {elso}, {masodik}, id LIMIT ?",
+            (n,),
+        ).fetchall()
+        return pd.DataFrame(sorok, columns=OSZLOPOK)
+
+    def __len__(self):
+        return self._kapcsolat().execute("SELECT COUNT(*) FROM eredmenyek").fetchone()[0]
+
+    def csv_import(self, csv_utvonal):
+        """A régi csv ranglista beolvasása. Ugyanazt a tartalmat csak egyszer importálja,
+        visszaadja a beszúrt sorok számát."""
+
+        with open(csv_utvonal, "rb") as f:
+            tartalom_hash = hashlib.sha256(f.read()).hexdigest()
+
+        sorok = _csv_sorai(csv_utvonal)
+        with self._kapcsolat() as kapcsolat:
+            uj = kapcsolat.execute(
+                "INSERT OR IGNORE INTO importalt_fajlok (tartalom_hash, utvonal) VALUES (?, ?)",
+                (tartalom_hash, os.path.abspath(csv_utvonal)),
+            ).rowcount
+            if not uj:
+                return 0
+            _tobb_beszurasa(kapcsolat, sorok)
+        return len(sorok)
+
+    def regi_csv_importalasa(self, csv_utvonal=REGI_CSV):
+        """A régi csv ranglista automatikus, adatbázisonként egyszeri importja.
+
+        Csak akkor importál, ha még sosem tette (jelző az egyszeri_importok táblában), és a
+        ranglista még üres (egy korábbi, tartalom hash szerinti import vagy már lejátszott játékok
+        után a csv sorai már benne vannak). Így egy ugyanebbe a fájlba mentett export sem kerül
+        be újra. Visszaadja a beszúrt sorok számát."""
+
+        sorok = _csv_sorai(csv_utvonal)
+        with self._kapcsolat() as kapcsolat:
+            uj = kapcsolat.execute(
+                "INSERT OR IGNORE INTO egyszeri_importok (nev, utvonal) VALUES (?, ?)",
+                (REGI_CSV_JELZO, os.path.abspath(csv_utvonal)),
+            ).rowcount
+            ures = kapcsolat.execute("SELECT NOT EXISTS (SELECT 1 FROM eredmenyek)").fetchone()[0]
+            if not uj or not ures:
+                return 0
+            _tobb_beszurasa(kapcsolat, sorok)
+        return len(sorok)
+
+    def tobb_hozzaadasa(self, sorok):
+        """Sok (jatekosnev, ossz_ido, ossz_tipp, start_time, mikor_jatszott) sor beszúrása
+        egyetlen tranzakcióban (pl. a ranglista újraépítéséhez, lásd esemenynaplo.py)."""
+
+        with self._kapcsolat() as kapcsolat:
+            return _tobb_beszurasa(kapcsolat, sorok)
+
+    def csv_export(self, csv_utvonal):
+        """A teljes ranglista kimentése a régi csv formátumban (beszúrási sorrendben)."""
+
+        kurzor = self._kapcsolat().execute(
+            "SELECT jatekosnev, ossz_ido, ossz_tipp, start_time, mikor_jatszott FROM eredmenyek ORDER BY id"
+        )
+        with open(csv_utvonal, mode="w", newline="", encoding="utf-8") as csvfile:
+            csvwriter = csv.writer(csvfile)
+            csvwriter.writerow(OSZLOPOK)
+            csvwriter.writerows(kurzor)
+
+
+def _csv_sorai(csv_utvonal):
+    with open(csv_utvonal, newline="", encoding="utf-8") as csvfile:
+        return [
+            (
+                sor["Játékosnév"],
+                float(sor["Össz. idő (mp)"]),
+                int(sor["Össz. tipp szám"]),
+                float(sor["start_time"]) if sor.get("start_time") else None,
+                sor.get("Mikor játszott"),
+            )
+            for sor in csv.DictReader(csvfile)
+        ]
+
+
+def _tobb_beszurasa(kapcsolat, sorok):
+    return kapcsolat.executemany(
+        "INSERT INTO eredmenyek (jatekosnev, ossz_ido, ossz_tipp, start_time, mikor_jatszott)"
+        " VALUES (?, ?, ?, ?, ?)",
+        sorok,
+    ).rowcount
+
+
+_megnyitott = {}
+_megnyitott_zar = threading.Lock()
+
+
+def ranglista_megnyitasa(utvonal=ADATBAZIS, regi_csv=REGI_CSV):
+    """Folyamatonként egyszer nyitja meg az adatbázist, és ha a régi csv ranglistát még sosem
+    importáltuk (és a ranglista üres), azt beolvassa."""
+
+    with _megnyitott_zar:
+        ranglista = _megnyitott.get(utvonal)
+        if ranglista is None:
+            ranglista = Ranglista(utvonal)
+            if regi_csv and os.path.isfile(regi_csv):
+                ranglista.regi_csv_importalasa(regi_csv)
+            _megnyitott[utvonal] = ranglista
+        return ranglista
+
+
+if __name__ == "__main__":
+    if not (
+        (len(sys.argv) == 3 and sys.argv[1] == "import")
+        or (len(sys.argv) in (2, 3) and sys.argv[1] == "export")
+    ):
+        sys.exit(f"Használat: python ranglista.py import <csv fájl> | export [csv fájl, alapból {EXPORT_CSV}]")
+    if sys.argv[1] == "import":
+        print(f"{Ranglista().csv_import(sys.argv[2])} sor beimportálva.")
+    else:
+        Ranglista().csv_export(sys.argv[2] if len(sys.argv) == 3 else EXPORT_CSV)
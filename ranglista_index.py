@@ -0,0 +1,122 @@
+"""Folyamaton belül megosztott, memóriában tartott rangsor-index a ranglista fölött.
+
+Mindkét rangsort (idő, majd tipp szám szerint, illetve fordítva) egy-egy rendezett listában
+(sortedcontainers.SortedList) tartjuk, így a beszúrás és egy eredmény helyezésének lekérdezése
+O(log n), az első k eredmény kiolvasása pedig O(k). Az eredményeket az adatbázis egyedi
+azonosítója (rowid) azonosítja, nem a float start_time.
+
+Az indexet a folyamat első használatakor felépítjük a SQLite ranglistából, utána az összes
+streamlit munkamenet ugyanazt használja. Minden lekérdezés előtt beolvassuk az esetleg más
+folyamatok által azóta beszúrt sorokat is (id > az utoljára látott id), így több szerverfolyamat
+esetén sem csúszik el a rangsor.
+"""
+
+import threading
+
+from sortedcontainers import SortedList
+
+from ranglista import ADATBAZIS, OSZLOPOK, REGI_CSV, ranglista_megnyitasa
+
+
+class RanglistaIndex:
+    """A ranglista.Ranglista fölötti index ugyanazzal a felülettel (hozzaad, helyezesek, top)."""
+
+    def __init__(self, ranglista):
+        self.ranglista = ranglista
+        self._ido = SortedList()  # (ossz_ido, ossz_tipp, id)
+        self._tipp = SortedList()  # (ossz_tipp, ossz_ido, id)
+        self._kulcsok = {}  # id -> (ossz_ido, ossz_tipp)
+        self._utolso_id = 0
+        self._zar = threading.Lock()
+        with self._zar:
+            self._felzarkozas()
+
+    def _felzarkozas(self):
+        """Az index frissítése az adatbázisba azóta bekerült sorokkal (a zár alatt hívandó)."""
+
+        sorok = self.ranglista._kapcsolat().execute(
+            "SELECT id, ossz_ido, ossz_tipp FROM eredmenyek WHERE id > ? ORDER BY id",
+            (self._utolso_id,),
+        ).fetchall()
+        if not sorok:
+            return
+        # az update() nagy tömegnél (pl. induláskor) egyben rendez, ez sokkal gyorsabb,
+        # mint soronként beszúrni
+        self._ido.update((ido, tipp, azonosito) for azonosito, ido, tipp in sorok)
+        self._tipp.update((tipp, ido, azonosito) for azonosito, ido, tipp in sorok)
+        self._kulcsok.update((azonosito, (ido, tipp)) for azonosito, ido, tipp in sorok)
+        self._utolso_id = sorok[-1][0]
+
+    def hozzaad(self, jatekosnev, ossz_ido, ossz_tipp, start_time=None, mikor_jatszott=None):
+        """Az eredmény eltárolása az adatbázisban és az indexben. Visszaadja az azonosítóját."""
+
+        azonosito = self.ranglista.hozzaad(
+            jatekosnev, ossz_ido, ossz_tipp, start_time, mikor_jatszott
+        )
+        with self._zar:
+            self._felzarkozas()
+        return azonosito
+
+    def helyezes(self, azonosito, rendezes="ido"):
+        """Az adott eredmény helyezése (1-től számozva), O(log n)."""
+
+        with self._zar:
+            if azonosito not in self._kulcsok:
+                self._felzarkozas()
+            ossz_ido, ossz_tipp = self._kulcsok[azonosito]
+            if rendezes == "ido":
+                return self._ido.bisect_left((ossz_ido, ossz_tipp, azonosito)) + 1
+            return self._tipp.bisect_left((ossz_tipp, ossz_ido, azonosito)) + 1
+
+    def helyezesek(self, azonosito):
+        """(helyezés idő alapján, helyezés tipp szám alapján)"""
+
+        return self.helyezes(azonosito, "ido"), self.helyezes(azonosito, "tipp")
+
+    def top_azonositok(self, n=10, rendezes="ido"):
+        """Az első n eredmény azonosítója a megadott rangsor szerint, O(log n + k)."""
+
+        with self._zar:
+            self._felzarkozas()
+            lista = self._ido if rendezes == "ido" else self._tipp
+            return [kulcs[2] for kulcs in lista[:n]]
+
+    def top(self, n=10, rendezes="ido"):
+        """Az első n eredmény a csv oszlopneveivel (pandas DataFrame). Csak a kiválasztott
+        sorok adatait olvassuk ki az adatbázisból, elsődleges kulcs alapján."""
+
+        import pandas as pd
+
+        azonositok = self.top_azonositok(n, rendezes)
+        if not azonositok:
+            return pd.DataFrame(columns=OSZLOPOK)
+        sorok = self.ranglista._kapcsolat().execute(
+            "SELECT id, jatekosnev, ossz_ido, ossz_tipp, start_time, mikor_jatszott FROM eredmenyek"
+            f" WHERE id IN ({', '.join('?' * len(azonositok))})",
+            azonositok,
+        )
+        sorok_id_szerint = {sor[0]: sor[1:] for sor in sorok}
+        return pd.DataFrame(
+            [sorok_id_szerint[azonosito] for azonosito in azonositok], columns=OSZLOPOK
+        )
+
+    def __len__(self):
+        with self._zar:
+            self._felzarkozas()
+            return len(self._kulcsok)
+
+
+_indexek = {}
+_indexek_zar = threading.Lock()
+
+
+def megosztott_ranglista(utvonal=ADATBAZIS, regi_csv=REGI_CSV):
+    """A folyamat összes munkamenete által közösen használt ranglista index (első híváskor épül fel).
+    A regi_csv-t a ranglista_megnyitasa() kapja meg; None esetén nincs régi csv import."""
+
+    with _indexek_zar:
+        index = _indexek.get(utvonal)
+        if index is None:
+            index = RanglistaIndex(ranglista_megnyitasa(utvonal, regi_csv))
+            _indexek[utvonal] = index
+        return index
@@ -0,0 +1,132 @@
+"""Magyar ábécérend szerinti rendezés az operációs rendszer locale beállításai nélkül.
+
+A locale.setlocale() az egész folyamatra hat, és nem szálbiztos (a streamlit több szálon futtatja
+a munkameneteket), ráadásul a szerveren sokszor nincs is magyar locale telepítve, ilyenkor pl. az
+"Ábrahámhegy" a "Zánka" mögé kerül. Itt a magyar ábécét magunk írjuk le:
+
+- a kettős és hármas betűk (cs, dz, dzs, gy, ly, ny, sz, ty, zs) külön betűnek számítanak,
+- a rövid és hosszú magánhangzók (a/á, e/é, i/í, o/ó, ö/ő, u/ú, ü/ű) elsődlegesen egyenrangúak,
+  csak teljes egyezés esetén kerül a rövid a hosszú elé (pl. "Kerék" < "Kérek"),
+- végül a kisbetű kerül a nagybetű elé.
+
+A legördülő lista rendezett opcióit helységnévtár-változatonként egyszer számoljuk ki, az
+ElotagIndex pedig a több ezer települést tartalmazó listák gyors szűkítésére való.
+"""
+
+import threading
+import unicodedata
+from bisect import bisect_left
+
+# a magyar ábécé betűi sorrendben; a rövid és hosszú magánhangzók ugyanazon a helyen állnak
+_ABC = [
+    ("a", "á"), ("b",), ("c",), ("cs",), ("d",), ("dz",), ("dzs",), ("e", "é"), ("f",),
+    ("g",), ("gy",), ("h",), ("i", "í"), ("j",), ("k",), ("l",), ("ly",), ("m",), ("n",),
+    ("ny",), ("o", "ó"), ("ö", "ő"), ("p",), ("q",), ("r",), ("s",), ("sz",), ("t",),
+    ("ty",), ("u", "ú"), ("ü", "ű"), ("v",), ("w",), ("x",), ("y",), ("z",), ("zs",),
+]
+
+# a számjegyek és írásjelek a betűk elé kerülnek
+_BETU_ELTOLAS = 20
+_ELSODLEGES = {}
+_MASODLAGOS = {}
+for _hely, _valtozatok in enumerate(_ABC):
+    for _hossz, _betu in enumerate(_valtozatok):
+        _ELSODLEGES[_betu] = _BETU_ELTOLAS + _hely
+        _MASODLAGOS[_betu] = _hossz
+
+_TOBBJEGYU = sorted((b for b in _ELSODLEGES if len(b) > 1), key=len, reverse=True)
+
+
+def _betuk(szo):
+    """A szó felbontása magyar betűkre (a leghosszabb illeszkedő kettős/hármas betűvel)."""
+
+    kisbetus = szo.lower()
+    i = 0
+    while i < len(kisbetus):
+        for tobbjegyu in _TOBBJEGYU:
+            if kisbetus.startswith(tobbjegyu, i):
+                yield tobbjegyu, szo[i : i + len(tobbjegyu)]
+                i += len(tobbjegyu)
+                break
+        else:
+            yield kisbetus[i], szo[i]
+            i += 1
+
+
+def _betu_sulyai(betu):
+    """(elsődleges, másodlagos) súly egy (kisbetűs) betűre."""
+
+    if betu in _ELSODLEGES:
+        return _ELSODLEGES[betu], _MASODLAGOS[betu]
+    if betu in "0123456789":
+        return 1 + int(betu), 0
+    alap = unicodedata.normalize("NFD", betu)[0]
+    if alap != betu and alap in _ELSODLEGES:
+        # idegen ékezetes betű (pl. ä, ç): az alapbetű helyére, a magyar változatok mögé kerül
+        return _ELSODLEGES[alap], 9
+    if not betu.isalpha():
+        return 0, 0  # szóköz, kötőjel és egyéb írásjelek
+    return _BETU_ELTOLAS + len(_ABC) + ord(betu), 0
+
+
+def magyar_kulcs(szo):
+    """Rendezési kulcs magyar ábécérendhez (sorted(..., key=magyar_kulcs))."""
+
+    elsodleges = []
+    masodlagos = []
+    harmadlagos = []
+    for betu, eredeti in _betuk(szo):
+        e, m = _betu_sulyai(betu)
+        elsodleges.append(e)
+        masodlagos.append(m)
+        harmadlagos.append(0 if eredeti == betu else 1)
+    return tuple(elsodleges), tuple(masodlagos), tuple(harmadlagos), szo
+
+
+def normalizalt(szo):
+    """Kisbetűs, ékezet nélküli alak a gépelés közbeni kereséshez ("bala" --> "Balatonfüred")."""
+
+    felbontott = unicodedata.normalize("NFD", szo.casefold())
+    return "".join(c for c in felbontott if not unicodedata.combining(c))
+
+
+class ElotagIndex:
+    """A (magyar ábécérendbe rendezett) településnevek szűkítése kezdőbetűk alapján, O(log n + k)."""
+
+    def __init__(self, rendezett_nevek):
+        self.nevek = list(rendezett_nevek)
+        parok = sorted((normalizalt(nev), hely) for hely, nev in enumerate(self.nevek))
+        self._kulcsok = [kulcs for kulcs, _ in parok]
+        self._helyek = [hely for _, hely in parok]
+
+    def szukites(self, elotag):
+        """Az elotag-gal kezdődő településnevek, magyar ábécérendben."""
+
+        elotag = normalizalt(elotag.strip())
+        if not elotag:
+            return self.nevek
+        eleje = bisect_left(self._kulcsok, elotag)
+        vege = bisect_left(self._kulcsok, elotag + "\U0010ffff", eleje)
+        return [self.nevek[hely] for hely in sorted(self._helyek[eleje:vege])]
+
+
+_cache = {}
+_cache_zar = threading.Lock()
+
+
+def rendezett_opciok(nevtar):
+    """A helységnévtár településnevei magyar ábécérendben és a hozzájuk tartozó ElotagIndex.
+    Helységnévtár-változatonként (nevtar.verzio) egyszer számoljuk ki."""
+
+    with _cache_zar:
+        talalat = _cache.get(nevtar.verzio)
+    if talalat is not None:
+        return talalat
+
+    rendezett = sorted(nevtar.varosok, key=magyar_kulcs)
+    talalat = (rendezett, ElotagIndex(rendezett))
+
+    with _cache_zar:
+        _cache.clear()  # csak az aktuális változatot tartjuk meg
+        _cache[nevtar.verzio] = talalat
+    return talalat
@@ -0,0 +1,241 @@
+"""Választható távolságszámító motorok: egy célpont és sok település közötti távolságot
+és irány-komponenseket egyetlen NumPy hívással számolják ki.
+
+Motorok (a pontosabbtól az olcsóbb felé):
+
+- "geodesic": geopy.distance.geodesic (Karney, WGS-84 ellipszoid), páronként hívva. Ez a referencia.
+  Tömeges számolásnál (egy_a_tobbhoz, vagyis a helységnévtár mátrixai és sorai) a geopy hurok
+  helyett a vele egyező vincenty fut (lásd VEKTORIZALT), a geopy csak a pontosság mérésénél kell.
+- "vincenty": Vincenty inverz formulája a WGS-84 ellipszoidon, vektorizálva.
+- "haversine": gömbi főkör-távolság (R = 6371.0088 km, a Föld átlagos sugara).
+- "equirectangular": síkvetület a két pont közepes szélességén (ugyanaz a "lapos föld"
+  közelítés, amit a jatek() az irányok megállapítására használ).
+
+Hibakorlátok a geopy geodesic-hez képest a Balaton befoglaló téglalapjában
+([17.18, 18.4] hosszúság, [46.66, 47.1] szélesség), 200 000 véletlen pontpáron, illetve
+a coordinates.xlsx mind a 43*42 rendezett településpárján mérve
+(lásd: hibakorlatok_merese()):
+
+=================  ===================  =====================  ==========================
+motor              max. abs. hiba (km)  max. relatív hiba      2 tizedesre kerekítve
+                                                               egyezik (43 település)
+=================  ===================  =====================  ==========================
+vincenty           < 1e-9               < 1e-10                1806 / 1806
+haversine          0.27                 0.29 %                 156 / 1806
+equirectangular    0.27                 0.29 %                 156 / 1806
+=================  ===================  =====================  ==========================
+
+Vagyis a 2 tizedesre kerekített km kiíráshoz csak a vincenty helyettesítheti a geodesic-et
+(és helyettesíti is: 300 település mátrixa geopy-val ~16 s, vincentyvel ~0.1 s),
+a gömbi közelítések már az első-második tizedesben eltérnek (a Balaton környékén ~0.3 %-kal
+rövidebb/hosszabb távolságot adnak az ellipszoid lapultsága miatt). Ezek akkor jönnek jól,
+ha csak sorrendezni kell (pl. legközelebbi szomszéd keresés), vagy ha a gazetteer akkora,
+hogy a pontos motor is túl drága.
+"""
+
+import numpy as np
+
+# WGS-84
+WGS84_A = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+FOLD_SUGAR = 6371.0088
+
+# a jatek() iránymeghatározásához használt "lapos föld" állandók
+LAT_KM = 111.574
+LONG_KM = 111.320
+
+
+def geodesic(lat0, lon0, lat, lon):
+    """Referencia: geopy geodesic, páronként (lassú, de pontos)."""
+
+    import geopy.distance
+
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    ki = np.empty(lat.shape)
+    for i, (la, lo) in enumerate(zip(lat.ravel(), lon.ravel())):
+        ki.flat[i] = geopy.distance.geodesic((lat0, lon0), (la, lo)).km
+    return ki
+
+
+def vincenty(lat0, lon0, lat, lon, max_iteracio=50, tolerancia=1e-12):
+    """Vincenty inverz formulája (WGS-84), vektorizálva a második ponthalmazra."""
+
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    f = WGS84_F
+
+    L = np.radians(lon - lon0)
+    U1 = np.arctan((1 - f) * np.tan(np.radians(lat0)))
+    U2 = np.arctan((1 - f) * np.tan(np.radians(lat)))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+
+    lam = L
+    for _ in range(max_iteracio):
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+        sin_sigma = np.hypot(cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam)
+        cos_sigma = sinU1 * sinU2 + cosU1 * cosU2 * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+        egybeeso = sin_sigma == 0
+        sin_alpha = np.where(
+            egybeeso, 0.0, cosU1 * cosU2 * sin_lam / np.where(egybeeso, 1.0, sin_sigma)
+        )
+        cos2_alpha = 1 - sin_alpha**2
+        cos_2sigma_m = np.where(
+            cos2_alpha == 0,
+            0.0,
+            cos_sigma
+            - 2 * sinU1 * sinU2 / np.where(cos2_alpha == 0, 1.0, cos2_alpha),
+        )
+        C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        uj_lam = L + (1 - C) * f * sin_alpha * (
+            sigma
+            + C
+            * sin_sigma
+            * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m**2))
+        )
+        kesz = np.all(np.abs(uj_lam - lam) < tolerancia)
+        lam = uj_lam
+        if kesz:
+            break
+
+    u2 = cos2_alpha * (WGS84_A**2 - WGS84_B**2) / WGS84_B**2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = (
+        B
+        * sin_sigma
+        * (
+            cos_2sigma_m
+            + B
+            / 4
+            * (
+                cos_sigma * (-1 + 2 * cos_2sigma_m**2)
+                - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma**2) * (-3 + 4 * cos_2sigma_m**2)
+            )
+        )
+    )
+    return np.where(egybeeso, 0.0, WGS84_B * A * (sigma - delta_sigma))
+
+
+def haversine(lat0, lon0, lat, lon):
+    """Gömbi főkör-távolság haversine formulával."""
+
+    fi0 = np.radians(lat0)
+    fi = np.radians(np.asarray(lat, dtype=np.float64))
+    dfi = fi - fi0
+    dlam = np.radians(np.asarray(lon, dtype=np.float64) - lon0)
+    h = np.sin(dfi / 2) ** 2 + np.cos(fi0) * np.cos(fi) * np.sin(dlam / 2) ** 2
+    return 2 * FOLD_SUGAR * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+def equirectangular(lat0, lon0, lat, lon):
+    """Síkvetület a két pont közepes szélességén (kis távolságokra jó közelítés)."""
+
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    x = np.radians(lon - lon0) * np.cos(np.radians((lat0 + lat) / 2))
+    y = np.radians(lat - lat0)
+    return FOLD_SUGAR * np.hypot(x, y)
+
+
+MOTOROK = {
+    "geodesic": geodesic,
+    "vincenty": vincenty,
+    "haversine": haversine,
+    "equirectangular": equirectangular,
+}
+
+# a tömeges számolásnál ezek a motorok a velük (2 tizedesre kerekítve) egyező vektorizált motorral futnak
+VEKTORIZALT = {"geodesic": "vincenty"}
+
+# relatív költség szerint növekvő sorrendben (a legolcsobb_egyezo_motor() ebben a sorrendben próbálja őket)
+OLCSOSAG_SZERINT = ["equirectangular", "haversine", "vincenty", "geodesic"]
+
+
+def motor(nev):
+    """Visszaadja a megadott nevű távolságszámító függvényt."""
+
+    try:
+        return MOTOROK[nev]
+    except KeyError:
+        raise ValueError(
+            f"Ismeretlen távolság motor: {nev!r} (lehetséges: {', '.join(MOTOROK)})"
+        ) from None
+
+
+def iranykomponensek(lat0, lon0, lat, lon):
+    """Az észak-déli és kelet-nyugati eltérés km-ben (abszolút értékben), ugyanazzal a
+    "lapos föld" közelítéssel, amivel a jatek() eddig is számolt."""
+
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    eszakdel = np.abs(lat0 - lat) * LAT_KM
+    keletnyugat = np.abs(lon0 - lon) * (LONG_KM * np.cos(np.radians((lat0 + lat) / 2)))
+    return eszakdel, keletnyugat
+
+
+def egy_a_tobbhoz(lat0, lon0, lat, lon, motor_nev="geodesic"):
+    """Egy célpont (lat0, lon0) és sok település közötti (távolság, észak-dél, kelet-nyugat)
+    km-ben, egyetlen hívással (a "geodesic" is vektorizáltan, lásd VEKTORIZALT)."""
+
+    motor(motor_nev)  # ismeretlen motornév esetén hibát dob
+    tavolsag = motor(VEKTORIZALT.get(motor_nev, motor_nev))(lat0, lon0, lat, lon)
+    eszakdel, keletnyugat = iranykomponensek(lat0, lon0, lat, lon)
+    return tavolsag, eszakdel, keletnyugat
+
+
+def legolcsobb_egyezo_motor(latitude, longitude, referencia="geodesic"):
+    """A legolcsóbb motor, amely az adott településeken minden rendezett párra ugyanazt a
+    2 tizedesre kerekített km értéket adja, mint a referencia."""
+
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    ref = np.round(
+        [motor(referencia)(la, lo, latitude, longitude) for la, lo in zip(latitude, longitude)],
+        2,
+    )
+    for nev in OLCSOSAG_SZERINT:
+        if nev == referencia:
+            return nev
+        probalt = np.round(
+            [motor(nev)(la, lo, latitude, longitude) for la, lo in zip(latitude, longitude)],
+            2,
+        )
+        if np.array_equal(probalt, ref):
+            return nev
+    return referencia
+
+
+def hibakorlatok_merese(parok=200_000, kiterjedes=(17.18, 18.4, 46.66, 47.1), seed=0):
+    """A modul docstringjében szereplő hibakorlátok újramérése véletlen pontpárokon.
+
+    Visszaad egy dict-et: motor neve -> (max. abszolút hiba km-ben, max. relatív hiba).
+    """
+
+    from geographiclib.geodesic import Geodesic
+
+    rng = np.random.default_rng(seed)
+    min_lon, max_lon, min_lat, max_lat = kiterjedes
+    lat1 = rng.uniform(min_lat, max_lat, parok)
+    lon1 = rng.uniform(min_lon, max_lon, parok)
+    lat2 = rng.uniform(min_lat, max_lat, parok)
+    lon2 = rng.uniform(min_lon, max_lon, parok)
+
+    # a geopy geodesic is a geographiclib-et hívja, így közvetlenül azt használjuk referenciának
+    ref = np.array(
+        [
+            Geodesic.WGS84.Inverse(a, b, c, d, Geodesic.DISTANCE)["s12"] / 1000
+            for a, b, c, d in zip(lat1, lon1, lat2, lon2)
+        ]
+    )
+
+    eredmeny = {}
+    for nev in ("vincenty", "haversine", "equirectangular"):
+        # a képletek elemenként is broadcastolnak, így a célpont is lehet tömb
+        becsult = MOTOROK[nev](lat1, lon1, lat2, lon2)
+        hiba = np.abs(becsult - ref)
+        eredmeny[nev] = (float(hiba.max()), float((hiba / np.maximum(ref, 1e-9)).max()))
+    return eredmeny
@@ -0,0 +1,257 @@
+"""Térbeli index a helységnévtár fölött: k legközelebbi település és adott sugáron belüli
+települések keresése, anélkül hogy minden lekérdezésnél az összes települést végig kellene nézni.
+
+Egyenletes rácsot használunk (mint egy geohash, csak km-ben): a településeket egy helyi,
+km-es síkvetületbe (x = hosszúság * cos(szélesség), y = szélesség) tesszük, és a rácscellájuk
+szerint rendezve tároljuk. Egy lekérdezés csak a környező cellák településeit nézi meg, a
+végső sorrendet és távolságot viszont a helységnévtár saját távolság motorja adja
+(tavolsag.egy_a_tobbhoz), így az eredmény pontosan egyezik a jatek() által kiírt távolságokkal.
+A síkvetület torzítását egy, az építéskor kiszámolt szorzóval (rahagyas) vesszük figyelembe,
+hogy a rácsszűrés ne dobjon el valódi találatot.
+
+A teljes Magyarországot lefedő (~3200 települést tartalmazó) helységnévtárnál is egy lekérdezés
+csak néhány tucat települést érint.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+import tavolsag
+
+KM_PER_FOK = 111.195  # egy szélességi fok hossza km-ben (gömbi közelítés)
+CELLA_PONTOK = 2  # átlagosan ennyi település jusson egy rácscellára
+MIN_CELLA_KM = 0.5
+
+# a nehézségi szintekhez: ennyi km-en belüli szomszédokat számolunk
+SURUSEG_SUGAR_KM = 10.0
+NEHEZSEGI_SZINTEK = ("könnyű", "közepes", "nehéz")
+
+
+class TerbeliIndex:
+    """Rács alapú térbeli index egy helysegnevtar.Helysegnevtar fölött."""
+
+    def __init__(self, nevtar):
+        self.nevtar = nevtar
+        lat = nevtar.latitude
+        lon = nevtar.longitude
+        n = len(lat)
+
+        self._ref_cos = math.cos(math.radians(float(lat.mean()))) if n else 1.0
+        self._x, self._y = self._vetites(lat, lon)
+
+        # a vetület x irányú torzítása a referencia szélességhez képest (+1% az ellipszoid miatt)
+        cosok = np.cos(np.radians(lat)) if n else np.ones(1)
+        self.rahagyas = (
+            max(float(cosok.max()) / self._ref_cos, self._ref_cos / float(cosok.min())) * 1.01
+        )
+
+        terulet = (
+            (float(np.ptp(self._x)) + MIN_CELLA_KM) * (float(np.ptp(self._y)) + MIN_CELLA_KM)
+            if n
+            else 1.0
+        )
+        self.cella_km = max(MIN_CELLA_KM, math.sqrt(terulet * CELLA_PONTOK / max(n, 1)))
+
+        # a települések cellák szerint rendezve; cella -> (eleje, vége) a rendezett tömbben
+        self._x0 = float(self._x.min()) if n else 0.0
+        self._y0 = float(self._y.min()) if n else 0.0
+        cx, cy = self._cella(self._x, self._y)
+        self._rend = np.lexsort((cy, cx)).astype(np.int64)
+        self._cellak = {}
+        for hely, sorszam in enumerate(self._rend):
+            kulcs = (int(cx[sorszam]), int(cy[sorszam]))
+            eleje, _ = self._cellak.get(kulcs, (hely, hely))
+            self._cellak[kulcs] = (eleje, hely + 1)
+        self._cx_tartomany = (int(cx.min()), int(cx.max())) if n else (0, 0)
+        self._cy_tartomany = (int(cy.min()), int(cy.max())) if n else (0, 0)
+
+        self._szintek = None
+        self._szint_zar = threading.Lock()
+
+    def _vetites(self, lat, lon):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        return lon * KM_PER_FOK * self._ref_cos, lat * KM_PER_FOK
+
+    def _cella(self, x, y):
+        return (
+            np.floor((x - self._x0) / self.cella_km).astype(np.int64),
+            np.floor((y - self._y0) / self.cella_km).astype(np.int64),
+        )
+
+    def _cellaszam(self, ertek, kezdet):
+        return int(math.floor((ertek - kezdet) / self.cella_km))
+
+    def _cellak_tartalma(self, cx_tol, cx_ig, cy_tol, cy_ig):
+        """A [cx_tol, cx_ig] x [cy_tol, cy_ig] cellákban lévő települések sorszámai."""
+
+        cx_tol, cx_ig = max(cx_tol, self._cx_tartomany[0]), min(cx_ig, self._cx_tartomany[1])
+        cy_tol, cy_ig = max(cy_tol, self._cy_tartomany[0]), min(cy_ig, self._cy_tartomany[1])
+        reszek = []
+        for cx in range(cx_tol, cx_ig + 1):
+            for cy in range(cy_tol, cy_ig + 1):
+                tartomany = self._cellak.get((cx, cy))
+                if tartomany is not None:
+                    reszek.append(self._rend[tartomany[0] : tartomany[1]])
+        return np.concatenate(reszek) if reszek else np.empty(0, dtype=np.int64)
+
+    def _pontos_tavolsag(self, lat, lon, sorszamok, kozeppont=None):
+        """A helységnévtár motorjával számolt távolság. Ha a lekérdezés egy település körül
+        történik (kozeppont), annak a helységnévtárban már kiszámolt sorát használjuk."""
+
+        if kozeppont is not None:
+            return np.asarray(self.nevtar.sor(kozeppont)[0], dtype=np.float64)[sorszamok]
+        tav, _, _ = tavolsag.egy_a_tobbhoz(
+            lat,
+            lon,
+            self.nevtar.latitude[sorszamok],
+            self.nevtar.longitude[sorszamok],
+            motor_nev=self.nevtar.motor,
+        )
+        return np.asarray(tav, dtype=np.float64)
+
+    def _jeloltek_sugaron_belul(self, x, y, sugar_km):
+        return self._cellak_tartalma(
+            self._cellaszam(x - sugar_km, self._x0),
+            self._cellaszam(x + sugar_km, self._x0),
+            self._cellaszam(y - sugar_km, self._y0),
+            self._cellaszam(y + sugar_km, self._y0),
+        )
+
+    def sugaron_belul(self, lat, lon, sugar_km, kozeppont=None):
+        """A (lat, lon) ponttól legfeljebb sugar_km-re lévő települések sorszámai és távolságai,
+        távolság szerint növekvő sorrendben: (sorszámok, távolságok km-ben).
+        Ha a pont maga is egy település, a sorszáma megadható kozeppont-ként (gyorsabb)."""
+
+        x, y = self._vetites(lat, lon)
+        jeloltek = self._jeloltek_sugaron_belul(x, y, sugar_km * self.rahagyas)
+        if not len(jeloltek):
+            return jeloltek, np.empty(0)
+        tav = self._pontos_tavolsag(lat, lon, jeloltek, kozeppont)
+        bent = tav <= sugar_km
+        jeloltek, tav = jeloltek[bent], tav[bent]
+        rend = np.argsort(tav, kind="stable")
+        return jeloltek[rend], tav[rend]
+
+    def legkozelebbi(self, lat, lon, k=1, kizart=(), kozeppont=None):
+        """A (lat, lon) ponthoz legközelebbi k település (a kizart sorszámok kivételével),
+        távolság szerint növekvő sorrendben: (sorszámok, távolságok km-ben)."""
+
+        kizart = np.asarray(list(kizart), dtype=np.int64)
+        x, y = self._vetites(lat, lon)
+        cx, cy = self._cellaszam(x, self._x0), self._cellaszam(y, self._y0)
+        max_gyuru = max(
+            abs(cx - self._cx_tartomany[0]),
+            abs(cx - self._cx_tartomany[1]),
+            abs(cy - self._cy_tartomany[0]),
+            abs(cy - self._cy_tartomany[1]),
+        )
+
+        # gyűrűnként haladunk kifelé, amíg a k-adik jelölt (vetületi) távolsága a rahagyással
+        # együtt is belül van a már teljesen átnézett négyzeten
+        jeloltek = np.empty(0, dtype=np.int64)
+        vetuleti = np.empty(0)
+        gyuru = 0
+        while True:
+            if gyuru == 0:
+                uj = self._cellak_tartalma(cx, cx, cy, cy)
+            else:
+                uj = np.concatenate(
+                    [
+                        self._cellak_tartalma(cx - gyuru, cx + gyuru, cy - gyuru, cy - gyuru),
+                        self._cellak_tartalma(cx - gyuru, cx + gyuru, cy + gyuru, cy + gyuru),
+                        self._cellak_tartalma(cx - gyuru, cx - gyuru, cy - gyuru + 1, cy + gyuru - 1),
+                        self._cellak_tartalma(cx + gyuru, cx + gyuru, cy - gyuru + 1, cy + gyuru - 1),
+                    ]
+                )
+            if len(kizart) and len(uj):
+                uj = uj[~np.isin(uj, kizart)]
+            if len(uj):
+                jeloltek = np.concatenate([jeloltek, uj])
+                vetuleti = np.concatenate([vetuleti, np.hypot(self._x[uj] - x, self._y[uj] - y)])
+
+            lefedett_km = gyuru * self.cella_km
+            if len(jeloltek) >= k:
+                kadik = np.partition(vetuleti, k - 1)[k - 1]
+                if kadik * self.rahagyas**2 <= lefedett_km:
+                    break
+            if gyuru >= max_gyuru:
+                break
+            gyuru += 1
+
+        if not len(jeloltek):
+            return jeloltek, np.empty(0)
+        if len(jeloltek) > k:
+            kadik = np.partition(vetuleti, k - 1)[k - 1]
+            jeloltek = jeloltek[vetuleti <= kadik * self.rahagyas**2]
+        tav = self._pontos_tavolsag(lat, lon, jeloltek, kozeppont)
+        rend = np.argsort(tav, kind="stable")[:k]
+        return jeloltek[rend], tav[rend]
+
+    def legkozelebbi_nem_tippelt(self, cel, tippelt):
+        """A cel sorszámú településhez legközelebbi, még nem tippelt település sorszáma és
+        távolsága (a "segítség" gombhoz). Ha már nincs ilyen, (None, None)."""
+
+        sorszamok, tav = self.legkozelebbi(
+            self.nevtar.latitude[cel],
+            self.nevtar.longitude[cel],
+            k=1,
+            kizart=[*tippelt, cel],
+            kozeppont=cel,
+        )
+        if not len(sorszamok):
+            return None, None
+        return int(sorszamok[0]), float(tav[0])
+
+    def kiterjedes(self, rahagyas=0.1, cimke_rahagyas=0.25, min_fok=0.1):
+        """A települések befoglaló téglalapja térképhez (min_lon, max_lon, min_lat, max_lat).
+
+        Minden oldalon a kiterjedés rahagyas-szorosával bővítjük, jobbra cimke_rahagyas-szorosával,
+        mert a városnevek a pontoktól jobbra kerülnek. Kifelé két tizedesre kerekítünk, hogy
+        a háttértérkép gyorsítótárának kulcsa stabil legyen.
+        """
+
+        lat, lon = self.nevtar.latitude, self.nevtar.longitude
+        min_lon, max_lon = float(lon.min()), float(lon.max())
+        min_lat, max_lat = float(lat.min()), float(lat.max())
+        lon_kiterjedes = max(max_lon - min_lon, min_fok)
+        lat_kiterjedes = max(max_lat - min_lat, min_fok)
+        return (
+            math.floor((min_lon - rahagyas * lon_kiterjedes) * 100) / 100,
+            math.ceil((max_lon + cimke_rahagyas * lon_kiterjedes) * 100) / 100,
+            math.floor((min_lat - rahagyas * lat_kiterjedes) * 100) / 100,
+            math.ceil((max_lat + rahagyas * lat_kiterjedes) * 100) / 100,
+        )
+
+    def szomszedok_szama(self, sugar_km=SURUSEG_SUGAR_KM):
+        """Minden településre: hány másik település van tőle legfeljebb sugar_km-re. Ehhez elég a
+        vetületi távolság (a pontos motor több ezer településnél sokáig tartana)."""
+
+        szamok = np.empty(len(self.nevtar), dtype=np.int64)
+        for i in range(len(self.nevtar)):
+            x, y = self._x[i], self._y[i]
+            jeloltek = self._jeloltek_sugaron_belul(x, y, sugar_km)
+            tav = np.hypot(self._x[jeloltek] - x, self._y[jeloltek] - y)
+            szamok[i] = np.count_nonzero(tav <= sugar_km) - 1
+        return szamok
+
+    def nehezsegi_szintek(self):
+        """Nehézségi szint -> a szinthez tartozó települések sorszámai (numpy tömb).
+
+        Minél több település van a környékén, annál nehezebb kitalálni, mert a távolság és irány
+        alapján sok hasonló jelölt marad. A településeket a szomszédaik száma szerint
+        harmadoljuk (könnyű: a legritkább környezetű harmad)."""
+
+        with self._szint_zar:
+            if self._szintek is None:
+                suruseg = self.szomszedok_szama()
+                rend = np.argsort(suruseg, kind="stable")
+                self._szintek = {
+                    szint: np.sort(resz)
+                    for szint, resz in zip(
+                        NEHEZSEGI_SZINTEK, np.array_split(rend, len(NEHEZSEGI_SZINTEK))
+                    )
+                }
+            return self._szintek
@@ -0,0 +1,216 @@
+"""Terhelés-szimulátor: sok egyszerre játszó (gépi) játékos a valódi játékmotoron és ranglistán.
+
+Minden szimulált játékos egy jatekmotor.GameSession-t játszik végig (alapból kompetitív, 3 kör),
+a tippjeit a még nem tippelt városok közül véletlenszerűen választja (--bot veletlen), vagy a
+jelöltkizárásos megoldóval (--bot megoldo, lásd megoldo.py), ami egy valódi játékoshoz hasonlóan
+kevés tippből talál. A játékosokat szál- vagy
+folyamatkészlet futtatja párhuzamosan, a ranglista egy ideiglenes SQLite adatbázis (hogy a valódi
+ranglistára ne kerüljenek gépi eredmények). A végén kiírja a másodpercenkénti tippek számát és a
+tippek, illetve a játék végi ranglista-frissítés késleltetésének percentiliseit.
+
+    python terheles.py --jatekosok 5000 --munkasok 8 --mod folyamat
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from betoltes import koordinatak_betoltese
+from helysegnevtar import helysegnevtar_betoltese
+from jatekmotor import KOMPETITIV_KOROK, GameSession
+from esemenynaplo import megosztott_esemenynaplo
+from megoldo import menet_megoldoja
+from ranglista_index import megosztott_ranglista
+
+PERCENTILISEK = (50, 90, 99, 99.9)
+
+
+def veletlen_bot(menet, veletlen):
+    """Az alap gépi játékos: a még nem tippelt városok közül választ véletlenszerűen."""
+
+    tippelt = set(menet.kor_tippjei)
+    while True:
+        tip = veletlen.randrange(len(menet.nevtar))
+        if tip not in tippelt:
+            return tip
+
+
+def megoldo_bot(menet, veletlen):
+    """A megoldó által javasolt legjobb tipp (megoldo.py)."""
+
+    tipp, _ = menet_megoldoja(menet).legjobb_tipp()
+    return tipp
+
+
+BOTOK = {"veletlen": veletlen_bot, "megoldo": megoldo_bot}
+
+
+def jatekos_szimulalasa(sorszam, nevtar, ranglista, korok_szama, bot, seed, naplo=None):
+    """Egy gépi játékos egy teljes játéka. Visszaadja a tippek és a játék végi (ranglistába
+    író) tipp késleltetését másodpercben."""
+
+    veletlen = random.Random(seed + sorszam)
+    menet = GameSession(
+        nevtar,
+        korok_szama=korok_szama,
+        jatekosnev=f"bot{sorszam}",
+        ranglista=ranglista,
+        veletlen=veletlen,
+        naplo=naplo,
+    )
+    tippek = []
+    befejezes = None
+    while not menet.vege:
+        if menet.kor_lezarva:
+            menet.kovetkezo_kor()
+        tip = bot(menet, veletlen)
+        kezdet = time.perf_counter()
+        eredmeny = menet.tipp_id(tip)
+        eltelt = time.perf_counter() - kezdet
+        if eredmeny.jatek_vege:
+            befejezes = eltelt
+        else:
+            tippek.append(eltelt)
+    return tippek, befejezes
+
+
+def _csomag(sorszamok, adatbazis, korok_szama, bot_nev, seed, esemenynaplo=None):
+    """Egy munkás (szál vagy folyamat) által lejátszott játékok. Folyamatonként egyszer tölti
+    be a helységnévtárat és a ranglista indexet (a modulok gyorsítótárazzák őket)."""
+
+    nevtar = helysegnevtar_betoltese(koordinatak_betoltese())
+    ranglista = megosztott_ranglista(adatbazis, regi_csv=None)
+    bot = BOTOK[bot_nev]
+    naplo = megosztott_esemenynaplo(esemenynaplo) if esemenynaplo else None
+    tippek = []
+    befejezesek = []
+    for sorszam in sorszamok:
+        jatek_tippjei, befejezes = jatekos_szimulalasa(
+            sorszam, nevtar, ranglista, korok_szama, bot, seed, naplo
+        )
+        tippek.extend(jatek_tippjei)
+        befejezesek.append(befejezes)
+    if naplo is not None:
+        naplo.kiurites(timeout=None)
+    return tippek, befejezesek
+
+
+def _percentilisek(ertekek):
+    if not ertekek:
+        return {}
+    ms = np.asarray(ertekek) * 1000
+    eredmeny = {f"p{p:g}": float(np.percentile(ms, p)) for p in PERCENTILISEK}
+    eredmeny["max"] = float(ms.max())
+    return eredmeny
+
+
+def szimulacio(
+    jatekosok=1000,
+    munkasok=os.cpu_count() or 4,
+    mod="szal",
+    korok_szama=KOMPETITIV_KOROK,
+    bot="veletlen",
+    adatbazis=None,
+    seed=0,
+    esemenynaplo=None,
+):
+    """A szimuláció lefuttatása, eredmény: dict (áteresztőképesség és késleltetés ms-ben)."""
+
+    if adatbazis is None:
+        adatbazis = os.path.join(tempfile.mkdtemp(prefix="terheles_"), "ranglista.sqlite3")
+
+    # előre létrehozzuk az adatbázist, hogy a munkások ne egyszerre próbálják
+    megosztott_ranglista(adatbazis, regi_csv=None)
+
+    csomagok = [list(range(i, jatekosok, munkasok)) for i in range(munkasok)]
+    keszlet = ProcessPoolExecutor if mod == "folyamat" else ThreadPoolExecutor
+
+    kezdet = time.perf_counter()
+    with keszlet(max_workers=munkasok) as vegrehajto:
+        reszeredmenyek = list(
+            vegrehajto.map(
+                _csomag,
+                csomagok,
+                [adatbazis] * munkasok,
+                [korok_szama] * munkasok,
+                [bot] * munkasok,
+                [seed] * munkasok,
+                [esemenynaplo] * munkasok,
+            )
+        )
+    falido = time.perf_counter() - kezdet
+
+    tippek = [t for resz, _ in reszeredmenyek for t in resz]
+    befejezesek = [b for _, resz in reszeredmenyek for b in resz]
+    osszes_tipp = len(tippek) + len(befejezesek)
+    return {
+        "jatekosok": jatekosok,
+        "munkasok": munkasok,
+        "mod": mod,
+        "korok": korok_szama,
+        "bot": bot,
+        "tippek": osszes_tipp,
+        "falido_mp": falido,
+        "tipp_per_mp": osszes_tipp / falido if falido else float("inf"),
+        "jatek_per_mp": jatekosok / falido if falido else float("inf"),
+        "tipp_kesleltetes_ms": _percentilisek(tippek),
+        "befejezes_kesleltetes_ms": _percentilisek(befejezesek),
+        "ranglista_meret": len(megosztott_ranglista(adatbazis, regi_csv=None)),
+        "adatbazis": adatbazis,
+    }
+
+
+def _kiiras(eredmeny):
+    print(
+        f"{eredmeny['jatekosok']} játékos, {eredmeny['munkasok']} munkás ({eredmeny['mod']}), "
+        f"{eredmeny['korok']} kör, bot: {eredmeny['bot']}"
+    )
+    print(
+        f"{eredmeny['tippek']} tipp {eredmeny['falido_mp']:.2f} mp alatt: "
+        f"{eredmeny['tipp_per_mp']:.0f} tipp/mp, {eredmeny['jatek_per_mp']:.1f} játék/mp"
+    )
+    for cim, kulcs in (
+        ("tipp", "tipp_kesleltetes_ms"),
+        ("játék vége (ranglista)", "befejezes_kesleltetes_ms"),
+    ):
+        reszek = ", ".join(f"{k}={v:.3f}" for k, v in eredmeny[kulcs].items())
+        print(f"  {cim} késleltetés (ms): {reszek}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jatekosok", type=int, default=1000)
+    parser.add_argument("--munkasok", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--mod", choices=("szal", "folyamat"), default="szal")
+    parser.add_argument("--korok", type=int, default=KOMPETITIV_KOROK)
+    parser.add_argument("--bot", choices=sorted(BOTOK), default="veletlen")
+    parser.add_argument("--adatbazis", help="alapból egy ideiglenes SQLite fájl")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--esemenynaplo", help="a gépi játékok eseményei ebbe a fájlba kerülnek")
+    parser.add_argument("--json", action="store_true", help="az eredmény JSON-ként")
+    args = parser.parse_args()
+
+    eredmeny = szimulacio(
+        jatekosok=args.jatekosok,
+        munkasok=args.munkasok,
+        mod=args.mod,
+        korok_szama=args.korok,
+        bot=args.bot,
+        adatbazis=args.adatbazis,
+        seed=args.seed,
+        esemenynaplo=args.esemenynaplo,
+    )
+    if args.json:
+        print(json.dumps(eredmeny, ensure_ascii=False, indent=2))
+    else:
+        _kiiras(eredmeny)
+
+
+if __name__ == "__main__":
+    main()
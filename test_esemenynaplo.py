@@ -0,0 +1,54 @@
+"""Az eseménynapló kötegelése (folyamatos, sűrű forgalomnál is legkésőbb KIIRAS_IDOKOZ mp
+után lemezre kerülnek az események, nem csak 1000 esemény összegyűlésekor), és a Statisztika
+felhagyott játékainak számolása.
+
+    python -m pytest -q
+"""
+
+import os
+import time
+
+from esemenynaplo import FELHAGYASI_IDO, KIIRAS_IDOKOZ, EsemenyNaplo, Statisztika
+
+
+def test_suru_esemenyek_idoben_kiirodnak(tmp_path):
+    utvonal = tmp_path / "esemenyek.jsonl"
+    naplo = EsemenyNaplo(str(utvonal))
+
+    kezdet = time.monotonic()
+    kiirva = None
+    while time.monotonic() - kezdet < 2 * KIIRAS_IDOKOZ + 0.5:
+        naplo.esemeny("tipp", jatek="teszt", ido=time.time())  # mp-nél sűrűbben, megállás nélkül
+        if kiirva is None and os.path.exists(utvonal) and os.path.getsize(utvonal):
+            kiirva = time.monotonic() - kezdet
+        time.sleep(0.1)
+
+    assert kiirva is not None
+    assert kiirva < KIIRAS_IDOKOZ + 0.3
+
+
+def test_kiurites_utan_minden_esemeny_a_fajlban(tmp_path):
+    utvonal = tmp_path / "esemenyek.jsonl"
+    naplo = EsemenyNaplo(str(utvonal))
+    for i in range(2500):
+        naplo.esemeny("tipp", jatek="teszt", n=i)
+    naplo.kiurites()
+    with open(utvonal, encoding="utf-8") as f:
+        assert sum(1 for _ in f) == 2500
+
+
+def test_lejart_majd_befejezett_jatek_csak_befejezettnek_szamit():
+    statisztika = Statisztika()
+    statisztika.feldolgozas({"e": "kezdet", "jatek": "a", "ido": 0, "korok": 1})
+    statisztika.feldolgozas({"e": "kezdet", "jatek": "b", "ido": 0, "korok": 1})
+    statisztika.feldolgozas({"e": "kezdet", "jatek": "c", "ido": FELHAGYASI_IDO + 1, "korok": 1})
+    assert statisztika.felhagyott == 2
+
+    # az "a" mégis folytatódik, a "b" pedig befejeződik
+    statisztika.feldolgozas({"e": "tipp", "jatek": "a", "ido": FELHAGYASI_IDO + 2, "n": 1, "tipp": "x"})
+    statisztika.feldolgozas({"e": "jatek_vege", "jatek": "b", "ido": FELHAGYASI_IDO + 3})
+    osszefoglalo = statisztika.osszefoglalo(most=FELHAGYASI_IDO + 4)
+    assert osszefoglalo["felhagyott_jatekok"] == 0
+    assert osszefoglalo["feladott_jatekok"] == 0
+    assert osszefoglalo["befejezett_jatekok"] == 1
+    assert osszefoglalo["folyamatban_levo_jatekok"] == 2
@@ -0,0 +1,48 @@
+"""A megoldó válaszkulcsai pontosan úgy osztják-e csoportokba a célpontokat, mint a jatek()
+szöveges válaszai: egy tippre két célpont kulcsa akkor és csak akkor egyezik, ha az üzenet is.
+
+    python -m pytest -q
+"""
+
+import numpy as np
+import pytest
+
+import helysegnevtar
+from betoltes import ALAP_XLSX, koordinata_oszlopok
+from jatekmotor import uzenet
+from megoldo import Megoldo, _kulcsok, tippek_szama, valasz_kulcs
+
+
+@pytest.fixture(scope="module", params=[True, False], ids=["matrix", "soronkent"])
+def nevtar(request):
+    if request.param:
+        return helysegnevtar.Helysegnevtar(*koordinata_oszlopok(ALAP_XLSX))
+    # a mátrix nélküli út: a kulcsok a tavolsag.egy_a_tobbhoz-ból jönnek
+    korlat = helysegnevtar.MATRIX_KORLAT
+    helysegnevtar.MATRIX_KORLAT = 0
+    try:
+        return helysegnevtar.Helysegnevtar(*koordinata_oszlopok(ALAP_XLSX))
+    finally:
+        helysegnevtar.MATRIX_KORLAT = korlat
+
+
+def test_kulcsok_ugyanugy_csoportositanak(nevtar):
+    mind = np.arange(len(nevtar))
+    kulcsok = _kulcsok(nevtar, mind, mind)
+    for tipp in mind:
+        uzenetek = [uzenet(nevtar, cel, tipp) for cel in mind]
+        for a in mind:
+            for b in mind[a + 1 :]:
+                assert (kulcsok[a, tipp] == kulcsok[b, tipp]) == (uzenetek[a] == uzenetek[b])
+
+
+def test_szukites_a_celpontot_megtartja(nevtar):
+    for cel in range(len(nevtar)):
+        megoldo = Megoldo(nevtar)
+        for tipp in range(0, len(nevtar), 7):
+            megoldo.szukites(tipp, valasz_kulcs(nevtar, cel, tipp))
+            assert megoldo.maszk[cel]
+
+
+def test_megoldo_minden_celt_kitalal(nevtar):
+    assert all(tippek_szama(nevtar, cel) < len(nevtar) for cel in range(len(nevtar)))
@@ -0,0 +1,73 @@
+"""A jatek() válaszai betűre egyeznek-e az eredeti (pandas + geopy) megvalósításéval.
+
+A régi képlet ide van bemásolva, és a csomagolt coordinates.xlsx minden (gép gondolata, tipp)
+párjára összevetjük az új jatekmotor.jatek()-kal, a teljes mátrixos és a soronként számolt
+(nagy helységnévtáras) helységnévtárral is. A haversine és az equirectangular motor szándékosan
+eltér (lásd tavolsag.py), ezért csak a geodesic és a vincenty szerepel.
+
+    python -m pytest -q
+"""
+
+import math
+
+import geopy.distance
+import pytest
+
+import helysegnevtar
+from betoltes import ALAP_XLSX, koordinatak_betoltese
+from jatekmotor import jatek
+
+
+def regi_jatek(tipp, coordinates, gepgondolata):
+    """Az eredeti interface.jatek() (a településnév-ellenőrzés nélkül, a legördülő lista miatt)."""
+
+    if gepgondolata == tipp:
+        return "    "
+    gep_lat = coordinates.loc[coordinates["Város"] == gepgondolata, "latitude"].values[0]
+    gep_long = coordinates.loc[coordinates["Város"] == gepgondolata, "longitude"].values[0]
+    tipp_lat = coordinates.loc[coordinates["Város"] == tipp, "latitude"].values[0]
+    tipp_long = coordinates.loc[coordinates["Város"] == tipp, "longitude"].values[0]
+
+    lat_km = 111.574
+    long_km = 111.320 * math.cos(math.radians((gep_lat + tipp_lat) / 2))
+
+    dif_lat = abs(gep_lat - tipp_lat) * lat_km
+    dif_long = abs(gep_long - tipp_long) * long_km
+
+    distance = geopy.distance.geodesic((gep_lat, gep_long), (tipp_lat, tipp_long)).km
+
+    eszakdel = "" if dif_lat < 3 else ("észak" if gep_lat > tipp_lat else "dél")
+    nyugatkelet = "" if dif_long < 3 else ("kelet" if gep_long > tipp_long else "nyugat")
+
+    if dif_lat < 3 and dif_long < 3:
+        return f"A gép által kigondolt város {tipp} településhez viszonyítva {round(distance, 2)} km-re található."
+
+    return f"A gép által kigondolt város {tipp} településhez viszonyítva {round(distance, 2)} km-re {eszakdel}{nyugatkelet} irányba található."
+
+
+@pytest.fixture(scope="module")
+def coordinates():
+    return koordinatak_betoltese(ALAP_XLSX)
+
+
+@pytest.fixture(scope="module")
+def regi_valaszok(coordinates):
+    varosok = coordinates["Város"].tolist()
+    return {(gep, tipp): regi_jatek(tipp, coordinates, gep) for gep in varosok for tipp in varosok}
+
+
+@pytest.mark.parametrize("motor", ["geodesic", "vincenty"])
+@pytest.mark.parametrize("matrixszal", [True, False])
+def test_jatek_valasza_valtozatlan(coordinates, regi_valaszok, monkeypatch, motor, matrixszal):
+    if not matrixszal:
+        # a MATRIX_KORLAT feletti helységnévtárak útja: soronként, egy_a_tobbhoz-zal számolva
+        monkeypatch.setattr(helysegnevtar, "MATRIX_KORLAT", 0)
+    nevtar = helysegnevtar.Helysegnevtar.tablazatbol(coordinates, motor=motor)
+    assert (nevtar.tavolsag_km is not None) == matrixszal
+
+    elterok = [
+        (gep, tipp)
+        for (gep, tipp), valasz in regi_valaszok.items()
+        if jatek(tipp, nevtar, gep) != valasz
+    ]
+    assert elterok == []